@@ -2,6 +2,7 @@
 认证处理模块 - 支持多种API认证方式
 """
 
+import base64
 from typing import Dict, Optional
 from enum import Enum
 
@@ -15,6 +16,18 @@ class AuthType(Enum):
     OAUTH2 = "oauth2"
 
 
+# 配置中的type字符串（小写） -> 认证类型
+_AUTH_TYPE_MAP = {
+    'apikey': AuthType.API_KEY,
+    'http': AuthType.HTTP_BEARER,
+    'bearer': AuthType.HTTP_BEARER,
+    'http_bearer': AuthType.HTTP_BEARER,
+    'basic': AuthType.HTTP_BASIC,
+    'http_basic': AuthType.HTTP_BASIC,
+    'oauth2': AuthType.OAUTH2,
+}
+
+
 class AuthHandler:
     """API认证处理器"""
 
@@ -38,29 +51,54 @@ class AuthHandler:
         """
         self.config = auth_config
         self.auth_type = self._determine_auth_type()
+        # 认证信息在处理器生命周期内不变，预先计算好避免每次请求重复编码
+        self._auth_header = self._build_auth_header()
 
     def _determine_auth_type(self) -> AuthType:
         """确定认证类型"""
         auth_type_str = self.config.get('type', 'none').lower()
+        return _AUTH_TYPE_MAP.get(auth_type_str, AuthType.NONE)
 
-        if auth_type_str == 'apikey':
-            return AuthType.API_KEY
-        elif auth_type_str in ['http', 'bearer', 'http_bearer']:
-            return AuthType.HTTP_BEARER
-        elif auth_type_str == 'basic':
-            return AuthType.HTTP_BASIC
-        elif auth_type_str == 'oauth2':
-            return AuthType.OAUTH2
-        else:
-            return AuthType.NONE
+    def _build_auth_header(self):
+        """
+        预计算认证信息
 
-    def apply_auth(self, headers: Dict, params: Dict) -> tuple[Dict, Dict]:
+        Returns:
+            - HTTP_BEARER/HTTP_BASIC/OAUTH2: Authorization头的值
+            - API_KEY: (name, value, in) 元组
+            - NONE: None
+        """
+        if self.auth_type == AuthType.HTTP_BEARER:
+            token = self.config.get('token', '')
+            return f"Bearer {token}"
+
+        elif self.auth_type == AuthType.HTTP_BASIC:
+            username = self.config.get('username', '')
+            password = self.config.get('password', '')
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            return f"Basic {credentials}"
+
+        elif self.auth_type == AuthType.API_KEY:
+            return (
+                self.config.get('name', 'X-API-Key'),
+                self.config.get('value', ''),
+                self.config.get('in', 'header')
+            )
+
+        elif self.auth_type == AuthType.OAUTH2:
+            token = self.config.get('access_token', '')
+            return f"Bearer {token}"
+
+        return None
+
+    def apply_auth(self, headers: Dict, params: Dict, inplace: bool = False) -> tuple[Dict, Dict]:
         """
         应用认证信息到请求
 
         Args:
             headers: HTTP headers字典
             params: 查询参数字典
+            inplace: 为True时直接修改传入的字典（调用方需保证字典可被修改）
 
         Returns:
             (更新后的headers, 更新后的params)
@@ -68,33 +106,22 @@ class AuthHandler:
         if self.auth_type == AuthType.NONE:
             return headers, params
 
-        headers = headers.copy()
-        params = params.copy()
-
-        if self.auth_type == AuthType.HTTP_BEARER:
-            token = self.config.get('token', '')
-            headers['Authorization'] = f"Bearer {token}"
-
-        elif self.auth_type == AuthType.HTTP_BASIC:
-            import base64
-            username = self.config.get('username', '')
-            password = self.config.get('password', '')
-            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-            headers['Authorization'] = f"Basic {credentials}"
-
-        elif self.auth_type == AuthType.API_KEY:
-            api_key_name = self.config.get('name', 'X-API-Key')
-            api_key_value = self.config.get('value', '')
-            api_key_in = self.config.get('in', 'header')
+        # 写时复制：只复制实际会被修改的字典
+        if self.auth_type == AuthType.API_KEY:
+            api_key_name, api_key_value, api_key_in = self._auth_header
 
             if api_key_in == 'header':
+                if not inplace:
+                    headers = headers.copy()
                 headers[api_key_name] = api_key_value
             elif api_key_in == 'query':
+                if not inplace:
+                    params = params.copy()
                 params[api_key_name] = api_key_value
-
-        elif self.auth_type == AuthType.OAUTH2:
-            token = self.config.get('access_token', '')
-            headers['Authorization'] = f"Bearer {token}"
+        else:
+            if not inplace:
+                headers = headers.copy()
+            headers['Authorization'] = self._auth_header
 
         return headers, params
 
@@ -2,12 +2,69 @@
 测试数据生成器 - 根据Schema自动生成测试数据
 """
 
+import copy
 import random
 import string
+import uuid
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 
 
+# 随机字符串字符池（模块加载时构建一次）
+_ALPHANUM = string.ascii_letters + string.digits
+_ALPHA = string.ascii_letters
+_NUMERIC = string.digits
+_PASSWORD = string.ascii_letters + string.digits + "!@#$%^&*()"  # 密码包含大小写字母、数字和特殊字符
+
+_POOLS = {
+    'alphanumeric': _ALPHANUM,
+    'alpha': _ALPHA,
+    'numeric': _NUMERIC,
+    'password': _PASSWORD,
+}
+
+# 长字符串批量生成：随机字节经translate映射为字符池中的字符（字符池均为ASCII）
+# 映射表只覆盖前 len(pool) * (256 // len(pool)) 个字节值（字符池的整数倍，每个字符出现次数相同），
+# 其余字节值删除后补充生成；256不能被字符池长度整除时若全部映射，表中靠前的字符会出现得更频繁
+_BULK_STRING_THRESHOLD = 1024
+_BULK_TABLES = {
+    name: (
+        (pool * (256 // len(pool))).ljust(256, '\0').encode('ascii'),  # 映射表
+        bytes(range(len(pool) * (256 // len(pool)), 256)),  # 需要删除的字节值
+    )
+    for name, pool in _POOLS.items()
+}
+
+# 日期基准时间的刷新间隔（生成次数）
+_NOW_REFRESH_INTERVAL = 1000
+
+# 安全测试使用的恶意payload（模块加载时构建一次）
+_MALICIOUS_PAYLOADS = (
+    # SQL注入
+    "' OR '1'='1",
+    "1; DROP TABLE users--",
+    "admin'--",
+
+    # XSS
+    "<script>alert('XSS')</script>",
+    "<img src=x onerror=alert('XSS')>",
+    "javascript:alert('XSS')",
+
+    # 路径遍历
+    "../../../etc/passwd",
+    "..\\..\\..\\windows\\system32\\config\\sam",
+
+    # 命令注入
+    "; ls -la",
+    "| cat /etc/passwd",
+    "`whoami`",
+
+    # 特殊字符
+    "null\x00byte",
+    "超长" + "A" * 10000,
+)
+
+
 class DataGenerator:
     """根据OpenAPI/Swagger schema生成测试数据"""
 
@@ -18,8 +75,43 @@ class DataGenerator:
         Args:
             seed: 随机种子，用于生成可复现的测试数据
         """
-        if seed:
-            random.seed(seed)
+        # 每个生成器使用独立的随机数实例，不修改全局random状态
+        self._rng = random.Random(seed)
+
+        # schema类型 -> 生成函数
+        self._generators = {
+            'object': self._generate_object,
+            'array': self._generate_array,
+            'string': self._generate_string,
+            'integer': self._generate_integer,
+            'number': self._generate_number,
+            'boolean': self._generate_boolean,
+        }
+
+        # 有效字符串的format -> 生成函数（与长度约束无关的格式）
+        self._format_generators = {
+            'email': self._format_email,
+            'uri': self._format_uri,
+            'url': self._format_uri,
+            'date': self._format_date,
+            'date-time': self._format_date_time,
+            'uuid': self._format_uuid,
+        }
+
+        # schema类型 -> 边界值构建函数
+        self._boundary_builders = {
+            'string': self._string_boundary_values,
+            'integer': self._numeric_boundary_values,
+            'number': self._numeric_boundary_values,
+            'array': self._array_boundary_values,
+        }
+
+        # 日期类数据的基准时间（避免每次生成都调用datetime.now()）
+        self._now = datetime.now()
+        self._now_uses = 0
+
+        # 边界值缓存: id(schema) -> (schema, 边界值列表)
+        self._boundary_cache: Dict[int, tuple] = {}
 
     def generate_from_schema(self, schema: Dict, valid: bool = True) -> Any:
         """
@@ -36,26 +128,19 @@ class DataGenerator:
             return None
 
         schema_type = schema.get('type')
-
-        if schema_type == 'object':
+        # OpenAPI 3.1允许type为列表（不可哈希），此时走推断逻辑
+        generator = self._generators.get(schema_type) if isinstance(schema_type, str) else None
+        if generator:
+            return generator(schema, valid)
+        return self._infer_from_schema(schema, valid)
+
+    def _infer_from_schema(self, schema: Dict, valid: bool) -> Any:
+        """没有指定type时，尝试根据其他属性推断"""
+        if 'properties' in schema:
             return self._generate_object(schema, valid)
-        elif schema_type == 'array':
+        if 'items' in schema:
             return self._generate_array(schema, valid)
-        elif schema_type == 'string':
-            return self._generate_string(schema, valid)
-        elif schema_type == 'integer':
-            return self._generate_integer(schema, valid)
-        elif schema_type == 'number':
-            return self._generate_number(schema, valid)
-        elif schema_type == 'boolean':
-            return self._generate_boolean(schema, valid)
-        else:
-            # 如果没有指定type，尝试根据其他属性推断
-            if 'properties' in schema:
-                return self._generate_object(schema, valid)
-            if 'items' in schema:
-                return self._generate_array(schema, valid)
-            return None
+        return None
 
     def _generate_object(self, schema: Dict, valid: bool) -> Dict:
         """生成对象"""
@@ -68,11 +153,11 @@ class DataGenerator:
 
             if valid:
                 # 生成有效数据：必填字段必须生成
-                if is_required or random.random() > 0.3:  # 70%概率生成非必填字段
+                if is_required or self._rng.random() > 0.3:  # 70%概率生成非必填字段
                     obj[prop_name] = self.generate_from_schema(prop_schema, valid=True)
             else:
                 # 生成无效数据：随机省略必填字段或生成错误类型
-                if is_required and random.random() > 0.5:
+                if is_required and self._rng.random() > 0.5:
                     continue  # 省略必填字段
                 else:
                     obj[prop_name] = self.generate_from_schema(prop_schema, valid=False)
@@ -87,10 +172,10 @@ class DataGenerator:
 
         if valid:
             # 生成有效数组
-            count = random.randint(max(min_items, 1), min(max_items, 5))
+            count = self._rng.randint(max(min_items, 1), min(max_items, 5))
         else:
             # 生成无效数组：超出范围
-            if random.random() > 0.5 and min_items > 0:
+            if self._rng.random() > 0.5 and min_items > 0:
                 count = min_items - 1  # 少于最小值
             else:
                 count = max_items + 1  # 超过最大值
@@ -108,34 +193,24 @@ class DataGenerator:
         # 如果有枚举值
         if enum_values:
             if valid:
-                return random.choice(enum_values)
+                return self._rng.choice(enum_values)
             else:
                 return "invalid_enum_value_12345"
 
         # 根据format生成特定格式的字符串
         if valid:
-            if format_type == 'email':
-                return f"test{random.randint(1, 1000)}@example.com"
-            elif format_type == 'uri' or format_type == 'url':
-                return f"https://example.com/path{random.randint(1, 100)}"
-            elif format_type == 'date':
-                date = datetime.now() - timedelta(days=random.randint(0, 365))
-                return date.strftime('%Y-%m-%d')
-            elif format_type == 'date-time':
-                dt = datetime.now() - timedelta(days=random.randint(0, 365))
-                return dt.isoformat()
-            elif format_type == 'uuid':
-                import uuid
-                return str(uuid.uuid4())
-            elif format_type == 'password':
+            format_generator = self._format_generators.get(format_type)
+            if format_generator:
+                return format_generator()
+            if format_type == 'password':
                 return self._random_string(max(min_length, 8), 'password')
             else:
                 # 普通字符串
-                length = random.randint(min_length, min(max_length, 20))
+                length = self._rng.randint(min_length, min(max_length, 20))
                 return self._random_string(length)
         else:
             # 生成无效字符串
-            if random.random() > 0.5 and max_length > 0:
+            if self._rng.random() > 0.5 and max_length > 0:
                 # 超长字符串
                 return self._random_string(max_length + 10)
             elif format_type == 'email':
@@ -146,6 +221,32 @@ class DataGenerator:
                 # 太短的字符串
                 return self._random_string(max(0, min_length - 1))
 
+    def _format_email(self) -> str:
+        return f"test{self._rng.randint(1, 1000)}@example.com"
+
+    def _format_uri(self) -> str:
+        return f"https://example.com/path{self._rng.randint(1, 100)}"
+
+    def _format_date(self) -> str:
+        date = self._base_time() - timedelta(days=self._rng.randint(0, 365))
+        return date.strftime('%Y-%m-%d')
+
+    def _format_date_time(self) -> str:
+        dt = self._base_time() - timedelta(days=self._rng.randint(0, 365))
+        return dt.strftime('%Y-%m-%dT%H:%M:%S')
+
+    def _base_time(self) -> datetime:
+        """日期生成的基准时间，每生成_NOW_REFRESH_INTERVAL次刷新一次"""
+        self._now_uses += 1
+        if self._now_uses >= _NOW_REFRESH_INTERVAL:
+            self._now = datetime.now()
+            self._now_uses = 0
+        return self._now
+
+    def _format_uuid(self) -> str:
+        # 由实例的随机数生成器产生，设置version后即为合法的UUID4，且可随seed复现
+        return str(uuid.UUID(bytes=self._rng.randbytes(16), version=4))
+
     def _generate_integer(self, schema: Dict, valid: bool) -> int:
         """生成整数"""
         minimum = schema.get('minimum', 0)
@@ -154,18 +255,15 @@ class DataGenerator:
 
         if enum_values:
             if valid:
-                return random.choice(enum_values)
+                return self._rng.choice(enum_values)
             else:
                 return maximum + 999  # 超出枚举范围
 
         if valid:
-            return random.randint(minimum, min(maximum, minimum + 100))
+            return self._rng.randint(minimum, min(maximum, minimum + 100))
         else:
-            # 生成无效整数：超出范围
-            if random.random() > 0.5:
-                return minimum - 1
-            else:
-                return maximum + 1
+            # 生成无效整数：随机取小于最小值或大于最大值
+            return (minimum - 1, maximum + 1)[self._rng.getrandbits(1)]
 
     def _generate_number(self, schema: Dict, valid: bool) -> float:
         """生成浮点数"""
@@ -173,17 +271,14 @@ class DataGenerator:
         maximum = schema.get('maximum', 1000.0)
 
         if valid:
-            return round(random.uniform(minimum, min(maximum, minimum + 100)), 2)
+            return round(self._rng.uniform(minimum, min(maximum, minimum + 100)), 2)
         else:
-            # 生成无效数字：超出范围
-            if random.random() > 0.5:
-                return minimum - 1.0
-            else:
-                return maximum + 1.0
+            # 生成无效数字：随机取小于最小值或大于最大值
+            return (minimum - 1.0, maximum + 1.0)[self._rng.getrandbits(1)]
 
     def _generate_boolean(self, schema: Dict, valid: bool) -> bool:
         """生成布尔值"""
-        return random.choice([True, False])
+        return self._rng.choice([True, False])
 
     def _random_string(self, length: int, type: str = 'alphanumeric') -> str:
         """
@@ -199,17 +294,21 @@ class DataGenerator:
         if length <= 0:
             return ""
 
-        if type == 'alpha':
-            chars = string.ascii_letters
-        elif type == 'numeric':
-            chars = string.digits
-        elif type == 'password':
-            # 密码包含大小写字母、数字和特殊字符
-            chars = string.ascii_letters + string.digits + "!@#$%^&*()"
-        else:  # alphanumeric
-            chars = string.ascii_letters + string.digits
+        if type not in _POOLS:
+            type = 'alphanumeric'
+
+        # 超长字符串（边界值、超长payload）走批量路径，避免逐字符生成
+        if length >= _BULK_STRING_THRESHOLD:
+            table, rejected = _BULK_TABLES[type]
+            chunks = []
+            remaining = length
+            while remaining > 0:
+                chunk = self._rng.randbytes(remaining).translate(table, rejected)
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            return b''.join(chunks).decode('ascii')
 
-        return ''.join(random.choice(chars) for _ in range(length))
+        return ''.join(self._rng.choices(_POOLS[type], k=length))
 
     def generate_boundary_values(self, schema: Dict) -> List[Dict[str, Any]]:
         """
@@ -221,110 +320,134 @@ class DataGenerator:
         Returns:
             边界值测试用例列表，每个包含 'description' 和 'value'
         """
-        boundary_cases = []
+        # schema加载后不会被修改，按对象标识缓存；保存schema引用以防id被复用
+        cached = self._boundary_cache.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return copy.deepcopy(cached[1])
+
+        boundary_cases = self._build_boundary_values(schema)
+        self._boundary_cache[id(schema)] = (schema, boundary_cases)
+        return copy.deepcopy(boundary_cases)
+
+    def _build_boundary_values(self, schema: Dict) -> List[Dict[str, Any]]:
+        """构建边界值测试数据（未缓存）"""
         schema_type = schema.get('type')
+        builder = self._boundary_builders.get(schema_type) if isinstance(schema_type, str) else None
+        if builder is None:
+            return []
+        return builder(schema)
 
-        if schema_type == 'string':
-            min_length = schema.get('minLength', 0)
-            max_length = schema.get('maxLength')
+    def _string_boundary_values(self, schema: Dict) -> List[Dict[str, Any]]:
+        """字符串长度边界值"""
+        boundary_cases = []
+        min_length = schema.get('minLength', 0)
+        max_length = schema.get('maxLength')
+
+        # 空字符串
+        boundary_cases.append({
+            'description': '空字符串',
+            'value': '',
+            'expected_valid': min_length == 0
+        })
+
+        # 最小长度
+        if min_length > 0:
+            boundary_cases.append({
+                'description': f'最小长度({min_length})',
+                'value': self._random_string(min_length),
+                'expected_valid': True
+            })
+            boundary_cases.append({
+                'description': f'小于最小长度({min_length - 1})',
+                'value': self._random_string(max(0, min_length - 1)),
+                'expected_valid': False
+            })
 
-            # 空字符串
+        # 最大长度
+        if max_length:
             boundary_cases.append({
-                'description': '空字符串',
-                'value': '',
-                'expected_valid': min_length == 0
+                'description': f'最大长度({max_length})',
+                'value': self._random_string(max_length),
+                'expected_valid': True
             })
+            boundary_cases.append({
+                'description': f'超过最大长度({max_length + 1})',
+                'value': self._random_string(max_length + 1),
+                'expected_valid': False
+            })
+
+        return boundary_cases
 
-            # 最小长度
-            if min_length > 0:
-                boundary_cases.append({
-                    'description': f'最小长度({min_length})',
-                    'value': self._random_string(min_length),
+    def _numeric_boundary_values(self, schema: Dict) -> List[Dict[str, Any]]:
+        """数值范围边界值"""
+        boundary_cases = []
+        minimum = schema.get('minimum')
+        maximum = schema.get('maximum')
+
+        if minimum is not None:
+            boundary_cases.extend([
+                {
+                    'description': f'最小值({minimum})',
+                    'value': minimum,
                     'expected_valid': True
-                })
-                boundary_cases.append({
-                    'description': f'小于最小长度({min_length - 1})',
-                    'value': self._random_string(max(0, min_length - 1)),
+                },
+                {
+                    'description': f'小于最小值({minimum - 1})',
+                    'value': minimum - 1,
                     'expected_valid': False
-                })
-
-            # 最大长度
-            if max_length:
-                boundary_cases.append({
-                    'description': f'最大长度({max_length})',
-                    'value': self._random_string(max_length),
+                }
+            ])
+
+        if maximum is not None:
+            boundary_cases.extend([
+                {
+                    'description': f'最大值({maximum})',
+                    'value': maximum,
                     'expected_valid': True
-                })
-                boundary_cases.append({
-                    'description': f'超过最大长度({max_length + 1})',
-                    'value': self._random_string(max_length + 1),
+                },
+                {
+                    'description': f'超过最大值({maximum + 1})',
+                    'value': maximum + 1,
                     'expected_valid': False
-                })
-
-        elif schema_type in ['integer', 'number']:
-            minimum = schema.get('minimum')
-            maximum = schema.get('maximum')
-
-            if minimum is not None:
-                boundary_cases.extend([
-                    {
-                        'description': f'最小值({minimum})',
-                        'value': minimum,
-                        'expected_valid': True
-                    },
-                    {
-                        'description': f'小于最小值({minimum - 1})',
-                        'value': minimum - 1,
-                        'expected_valid': False
-                    }
-                ])
-
-            if maximum is not None:
-                boundary_cases.extend([
-                    {
-                        'description': f'最大值({maximum})',
-                        'value': maximum,
-                        'expected_valid': True
-                    },
-                    {
-                        'description': f'超过最大值({maximum + 1})',
-                        'value': maximum + 1,
-                        'expected_valid': False
-                    }
-                ])
-
-        elif schema_type == 'array':
-            min_items = schema.get('minItems', 0)
-            max_items = schema.get('maxItems')
-            items_schema = schema.get('items', {})
-
-            # 空数组
+                }
+            ])
+
+        return boundary_cases
+
+    def _array_boundary_values(self, schema: Dict) -> List[Dict[str, Any]]:
+        """数组元素数边界值"""
+        boundary_cases = []
+        min_items = schema.get('minItems', 0)
+        max_items = schema.get('maxItems')
+        items_schema = schema.get('items', {})
+
+        # 空数组
+        boundary_cases.append({
+            'description': '空数组',
+            'value': [],
+            'expected_valid': min_items == 0
+        })
+
+        # 最小元素数
+        if min_items > 0:
             boundary_cases.append({
-                'description': '空数组',
-                'value': [],
-                'expected_valid': min_items == 0
+                'description': f'最小元素数({min_items})',
+                'value': [self.generate_from_schema(items_schema, True) for _ in range(min_items)],
+                'expected_valid': True
             })
 
-            # 最小元素数
-            if min_items > 0:
-                boundary_cases.append({
-                    'description': f'最小元素数({min_items})',
-                    'value': [self.generate_from_schema(items_schema, True) for _ in range(min_items)],
-                    'expected_valid': True
-                })
-
-            # 最大元素数
-            if max_items:
-                boundary_cases.append({
-                    'description': f'最大元素数({max_items})',
-                    'value': [self.generate_from_schema(items_schema, True) for _ in range(max_items)],
-                    'expected_valid': True
-                })
-                boundary_cases.append({
-                    'description': f'超过最大元素数({max_items + 1})',
-                    'value': [self.generate_from_schema(items_schema, True) for _ in range(max_items + 1)],
-                    'expected_valid': False
-                })
+        # 最大元素数
+        if max_items:
+            boundary_cases.append({
+                'description': f'最大元素数({max_items})',
+                'value': [self.generate_from_schema(items_schema, True) for _ in range(max_items)],
+                'expected_valid': True
+            })
+            boundary_cases.append({
+                'description': f'超过最大元素数({max_items + 1})',
+                'value': [self.generate_from_schema(items_schema, True) for _ in range(max_items + 1)],
+                'expected_valid': False
+            })
 
         return boundary_cases
 
@@ -335,27 +458,4 @@ class DataGenerator:
         Returns:
             恶意payload列表
         """
-        return [
-            # SQL注入
-            "' OR '1'='1",
-            "1; DROP TABLE users--",
-            "admin'--",
-
-            # XSS
-            "<script>alert('XSS')</script>",
-            "<img src=x onerror=alert('XSS')>",
-            "javascript:alert('XSS')",
-
-            # 路径遍历
-            "../../../etc/passwd",
-            "..\\..\\..\\windows\\system32\\config\\sam",
-
-            # 命令注入
-            "; ls -la",
-            "| cat /etc/passwd",
-            "`whoami`",
-
-            # 特殊字符
-            "null\x00byte",
-            "超长" + "A" * 10000,
-        ]
+        return list(_MALICIOUS_PAYLOADS)
@@ -2,19 +2,38 @@
 测试执行引擎 - 执行API测试用例并收集结果
 """
 
+import functools
+import json
 import requests
 import time
-from typing import Dict, List, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from .validator import ResponseValidator
 from .auth import AuthHandler
 
 
+# 流式响应体小于该值时读完以复用连接，否则直接关闭
+_DRAIN_LIMIT = 64 * 1024
+
+# 请求/响应信息的预序列化格式（与报告中展示的格式一致）
+_dumps_info = functools.partial(json.dumps, indent=2, ensure_ascii=False)
+
+
+class _KeepMissing(dict):
+    """str.format_map使用的映射：缺失的参数保留为 {name}"""
+
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
 class TestResult:
     """单个测试用例的结果"""
 
     def __init__(self, test_case: Dict):
         self.test_case = test_case
+        # 报告按端点分组使用的键，构造结果时生成一次
+        self.endpoint_key = f"{test_case.get('method')} {test_case.get('path')}"
         self.passed = False
         self.status_code = None
         self.response_data = None
@@ -23,6 +42,9 @@ class TestResult:
         self.warnings = []
         self.request_info = {}
         self.response_info = {}
+        # 预序列化的请求/响应信息，执行结束时填充，报告直接输出
+        self.request_json: Optional[str] = None
+        self.response_json: Optional[str] = None
 
     def to_dict(self) -> Dict:
         """转换为字典"""
@@ -49,7 +71,8 @@ class TestExecutor:
             base_url: str,
             auth_handler: Optional[AuthHandler] = None,
             timeout: int = 30,
-            verify_ssl: bool = True
+            verify_ssl: bool = True,
+            pool_size: int = 20
     ):
         """
         初始化测试执行器
@@ -59,6 +82,7 @@ class TestExecutor:
             auth_handler: 认证处理器
             timeout: 请求超时时间（秒）
             verify_ssl: 是否验证SSL证书
+            pool_size: 连接池大小（并行执行时应与并行线程数一致）
         """
         self.base_url = base_url.rstrip('/')
         self.auth_handler = auth_handler
@@ -66,13 +90,36 @@ class TestExecutor:
         self.verify_ssl = verify_ssl
         self.session = requests.Session()
 
-    def execute_test_case(self, test_case: Dict, endpoint: Dict) -> TestResult:
+        # 连接池与并行线程数一致，保证并行请求能复用keep-alive连接而不是反复握手；
+        # 失败不自动重试，否则会影响测试结果和耗时统计
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # 默认请求头放在session上，不必每个请求重新构建
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'Connection': 'keep-alive'
+        })
+
+        # 并行执行使用的线程池，跨测试套件复用（首次并行执行时创建）
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_workers = 0
+
+    def execute_test_case(
+            self,
+            test_case: Dict,
+            endpoint: Dict,
+            validator: Optional[ResponseValidator] = None
+    ) -> TestResult:
         """
         执行单个测试用例
 
         Args:
             test_case: 测试用例
             endpoint: 端点信息
+            validator: 该端点的响应验证器（可选，未提供时按需创建）
 
         Returns:
             TestResult对象
@@ -86,12 +133,21 @@ class TestExecutor:
             params = test_case.get('query_params', {})
 
             # 应用认证（除非测试用例要求跳过）
+            # headers由_build_headers新建，params复制一次，认证处理器可直接修改
             if self.auth_handler and not test_case.get('skip_auth'):
-                headers, params = self.auth_handler.apply_auth(headers, params)
+                headers, params = self.auth_handler.apply_auth(headers, dict(params), inplace=True)
+
+            # 只检查状态码的用例不需要响应体：流式请求，读取状态码后即可释放
+            needs_body = bool(test_case.get('validate_schema') or test_case.get('parse_body'))
+
+            # 用例可通过use_head要求以HEAD代替GET，只获取状态码
+            method = test_case['method']
+            if not needs_body and test_case.get('use_head') and method == 'GET':
+                method = 'HEAD'
 
             # 记录请求信息
             result.request_info = {
-                'method': test_case['method'],
+                'method': method,
                 'url': url,
                 'headers': headers,
                 'params': params,
@@ -101,11 +157,12 @@ class TestExecutor:
             # 发送请求
             start_time = time.time()
             response = self._send_request(
-                method=test_case['method'],
+                method=method,
                 url=url,
                 headers=headers,
                 params=params,
-                json=test_case.get('body')
+                data=self._encode_body(test_case.get('body')),
+                stream=not needs_body
             )
             end_time = time.time()
 
@@ -113,21 +170,32 @@ class TestExecutor:
             result.status_code = response.status_code
             result.response_time = round((end_time - start_time) * 1000, 2)  # 转换为毫秒
 
-            # 解析响应数据
-            try:
-                result.response_data = response.json() if response.text else None
-            except:
-                result.response_data = response.text
+            if needs_body:
+                # 解析响应数据
+                try:
+                    # json.loads直接处理bytes，省去requests的编码探测
+                    result.response_data = json.loads(response.content) if response.content else None
+                except (json.JSONDecodeError, ValueError):
+                    # 非JSON响应（如HTML错误页）保留原始文本
+                    result.response_data = response.text
+                content_length = len(response.content)
+            else:
+                content_length = self._release_response(response)
+
+            # 响应头只转换一次，报告与验证器共用同一个字典
+            # （报告需要JSON序列化，不能直接保存CaseInsensitiveDict）
+            response_headers = dict(response.headers)
 
             result.response_info = {
                 'status_code': response.status_code,
-                'headers': dict(response.headers),
+                'headers': response_headers,
                 'data': result.response_data,
+                'content_length': content_length,
                 'response_time_ms': result.response_time
             }
 
             # 验证响应
-            self._validate_response(test_case, result, endpoint)
+            self._validate_response(test_case, result, endpoint, validator)
 
             # 判断测试是否通过
             result.passed = len(result.errors) == 0
@@ -144,6 +212,7 @@ class TestExecutor:
             result.errors.append(f"执行异常: {str(e)}")
             result.passed = False
 
+        self._serialize_result(result)
         return result
 
     def execute_test_suite(
@@ -167,93 +236,172 @@ class TestExecutor:
         """
         results = []
 
+        # 同一端点的用例共用一个验证器（验证器只读，可在线程间共享）
+        validator = ResponseValidator(endpoint)
+
         if parallel:
             # 并行执行
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_case = {
-                    executor.submit(self.execute_test_case, case, endpoint): case
-                    for case in test_cases
-                }
-
-                for future in as_completed(future_to_case):
-                    try:
-                        result = future.result()
-                        results.append(result)
-                    except Exception as e:
-                        case = future_to_case[future]
-                        error_result = TestResult(case)
-                        error_result.passed = False
-                        error_result.errors.append(f"执行异常: {str(e)}")
-                        results.append(error_result)
+            # execute_test_case内部已捕获异常并记录到结果中；map保持用例顺序
+            executor = self._get_pool(max_workers)
+            results = list(executor.map(
+                lambda case: self.execute_test_case(case, endpoint, validator),
+                test_cases
+            ))
         else:
             # 串行执行
             for case in test_cases:
-                result = self.execute_test_case(case, endpoint)
+                result = self.execute_test_case(case, endpoint, validator)
                 results.append(result)
 
         return results
 
+    def execute_flat(
+            self,
+            pairs: Iterable[Tuple[Dict, Dict]],
+            parallel: bool = False,
+            max_workers: int = 5,
+            on_result: Optional[Callable[[int, TestResult], None]] = None
+    ) -> List[TestResult]:
+        """
+        执行多个端点的测试用例（并行时所有用例提交到同一个线程池）
+
+        pairs可以是边生成边产出用例的迭代器：并行时最多同时提交max_workers的2倍个用例，
+        有用例完成后再继续从迭代器读取，用例生成与执行流水线进行
+
+        Args:
+            pairs: (端点信息, 测试用例) 的列表或迭代器
+            parallel: 是否并行执行
+            max_workers: 最大并行数
+            on_result: 每个用例完成时的回调，参数为(用例在pairs中的下标, 结果)，在调用线程中执行
+
+        Returns:
+            测试结果列表（与pairs顺序一致）
+        """
+        # 同一端点的用例共用一个验证器
+        validators = {}
+        results: List[Optional[TestResult]] = []
+
+        def get_validator(endpoint):
+            validator = validators.get(id(endpoint))
+            if validator is None:
+                validator = validators[id(endpoint)] = ResponseValidator(endpoint)
+            return validator
+
+        def finish(i, result):
+            results[i] = result
+            if on_result:
+                on_result(i, result)
+
+        if parallel:
+            executor = self._get_pool(max_workers)
+            max_pending = max_workers * 2
+            pending = {}
+            for i, (endpoint, case) in enumerate(pairs):
+                results.append(None)
+                pending[executor.submit(self.execute_test_case, case, endpoint, get_validator(endpoint))] = i
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(pending.pop(future), future.result())
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(pending.pop(future), future.result())
+        else:
+            for i, (endpoint, case) in enumerate(pairs):
+                results.append(None)
+                finish(i, self.execute_test_case(case, endpoint, get_validator(endpoint)))
+
+        return results
+
+    def _get_pool(self, max_workers: int) -> ThreadPoolExecutor:
+        """获取复用的线程池（线程数变化时重建）"""
+        if self._pool is None or self._pool_workers != max_workers:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+            self._pool = ThreadPoolExecutor(max_workers=max_workers)
+            self._pool_workers = max_workers
+        return self._pool
+
     def _build_url(self, test_case: Dict) -> str:
         """构建完整URL"""
         path = test_case['path']
 
-        # 替换路径参数
-        path_params = test_case.get('path_params', {})
-        for param_name, param_value in path_params.items():
-            path = path.replace(f"{{{param_name}}}", str(param_value))
+        path_params = test_case.get('path_params')
+        if not path_params:
+            return f"{self.base_url}{path}"
+
+        # 一次扫描替换所有路径参数，未提供的参数保留原样
+        try:
+            path = path.format_map(_KeepMissing(path_params))
+        except (ValueError, IndexError, AttributeError):
+            # 路径中包含非标准的花括号写法，退回逐个替换
+            for param_name, param_value in path_params.items():
+                path = path.replace(f"{{{param_name}}}", str(param_value))
 
         return f"{self.base_url}{path}"
 
     def _build_headers(self, test_case: Dict) -> Dict:
-        """构建请求头"""
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-
-        # 添加测试用例指定的headers
-        if test_case.get('headers'):
-            headers.update(test_case['headers'])
+        """构建请求头（默认请求头已在session上设置）"""
+        # 复制测试用例指定的headers，返回的字典由调用方持有
+        return dict(test_case.get('headers') or {})
 
-        return headers
+    def _encode_body(self, body: Any) -> Optional[bytes]:
+        """将请求体序列化为JSON字节（Content-Type已在session上设置）"""
+        if body is None:
+            return None
+        return json.dumps(body, allow_nan=False).encode('utf-8')
 
     def _send_request(self, method: str, url: str, **kwargs) -> requests.Response:
-        """发送HTTP请求"""
-        method = method.upper()
-
-        if method == 'GET':
-            return self.session.get(url, timeout=self.timeout, verify=self.verify_ssl, **kwargs)
-        elif method == 'POST':
-            return self.session.post(url, timeout=self.timeout, verify=self.verify_ssl, **kwargs)
-        elif method == 'PUT':
-            return self.session.put(url, timeout=self.timeout, verify=self.verify_ssl, **kwargs)
-        elif method == 'DELETE':
-            return self.session.delete(url, timeout=self.timeout, verify=self.verify_ssl, **kwargs)
-        elif method == 'PATCH':
-            return self.session.patch(url, timeout=self.timeout, verify=self.verify_ssl, **kwargs)
-        elif method == 'OPTIONS':
-            return self.session.options(url, timeout=self.timeout, verify=self.verify_ssl, **kwargs)
-        elif method == 'HEAD':
-            return self.session.head(url, timeout=self.timeout, verify=self.verify_ssl, **kwargs)
-        else:
-            raise ValueError(f"不支持的HTTP方法: {method}")
+        """发送HTTP请求（方法名由SwaggerParser统一为大写）"""
+        return self.session.request(method, url, timeout=self.timeout, verify=self.verify_ssl, **kwargs)
+
+    def _release_response(self, response: requests.Response) -> Optional[int]:
+        """
+        释放流式响应，返回响应体长度（未知时为None）
+
+        小响应体直接读完，让连接回到连接池继续复用；
+        大响应体不再下载，直接关闭连接。
+        """
+        length = response.headers.get('Content-Length')
+        if length is not None and length.isdigit() and int(length) <= _DRAIN_LIMIT:
+            return len(response.content)
 
-    def _validate_response(self, test_case: Dict, result: TestResult, endpoint: Dict):
+        response.close()
+        return int(length) if length is not None and length.isdigit() else None
+
+    def _serialize_result(self, result: TestResult):
+        """预先序列化请求/响应信息（无法序列化时留空，由报告自行处理）"""
+        try:
+            result.request_json = _dumps_info(result.request_info)
+            result.response_json = _dumps_info(result.response_info)
+        except (TypeError, ValueError):
+            result.request_json = result.response_json = None
+
+    def _validate_response(
+            self,
+            test_case: Dict,
+            result: TestResult,
+            endpoint: Dict,
+            validator: Optional[ResponseValidator] = None
+    ):
         """验证响应"""
-        # 1. 验证状态码
-        expected_codes = test_case.get('expected_status_codes', [])
+        # 1. 验证状态码（生成器中的期望状态码为各用例共享的元组，只读使用）
+        expected_codes = test_case.get('expected_status_codes', ())
         if expected_codes and result.status_code not in expected_codes:
             result.errors.append(
-                f"状态码错误: 期望{expected_codes}, 实际{result.status_code}"
+                f"状态码错误: 期望{list(expected_codes)}, 实际{result.status_code}"
             )
 
         # 2. 如果需要验证Schema
         if test_case.get('validate_schema') and result.response_data is not None:
-            validator = ResponseValidator(endpoint)
+            if validator is None:
+                validator = ResponseValidator(endpoint)
             validation_result = validator.validate_response(
                 status_code=result.status_code,
                 response_data=result.response_data,
-                headers=result.response_info.get('headers', {}),
+                headers=result.response_info['headers'],
                 strict_schema=test_case.get('strict_schema', False)
             )
 
@@ -261,5 +409,8 @@ class TestExecutor:
             result.warnings.extend(validation_result['warnings'])
 
     def close(self):
-        """关闭session"""
+        """关闭线程池和session"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
         self.session.close()
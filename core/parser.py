@@ -2,11 +2,165 @@
 Swagger/OpenAPI解析器 - 兼容Swagger 2.0和OpenAPI 3.0+
 """
 
+import functools
 import json
+import sys
 import yaml
-from typing import Dict, List, Any, Optional
+from itertools import chain
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Iterator, Optional
 from pathlib import Path
 
+from .yaml_cache import YamlLoader, cache_header_for, cache_path_for, read_json_cache, write_json_cache
+
+# YAML规范文件的扩展名
+_YAML_SUFFIXES = frozenset(('.yaml', '.yml'))
+
+# 路径项中可能出现的HTTP方法（按此顺序生成端点）
+_HTTP_METHODS = ('get', 'post', 'put', 'delete', 'patch', 'options', 'head', 'trace')
+_HTTP_METHOD_SET = frozenset(_HTTP_METHODS)
+_HTTP_METHOD_ORDER = {method: index for index, method in enumerate(_HTTP_METHODS)}
+
+# 默认operationId中将路径的'/'替换为'_'
+_SLASH_TO_UNDERSCORE = str.maketrans('/', '_')
+
+# Swagger 2.0参数中直接定义的schema约束字段
+_SWAGGER2_SCHEMA_KEYS = ('type', 'format', 'enum', 'minimum', 'maximum', 'minLength', 'maxLength')
+
+# 取值为少量固定字符串的字段，加载规范时驻留其取值
+_INTERNED_VALUE_KEYS = frozenset(('type', 'in', 'format', 'method'))
+
+
+def _intern_strings(spec: Any) -> Any:
+    """
+    驻留规范中的字符串键和枚举类取值（就地修改，使用显式栈迭代遍历）
+
+    规范中大量重复的短字符串（'type'、'schema'、'string'等）驻留后只保留一份，
+    之后的字典查找和比较也只需比较指针
+    """
+    intern = sys.intern
+    seen = set()
+    stack = [spec]
+
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        if isinstance(node, dict):
+            items = list(node.items())
+            node.clear()
+            for key, value in items:
+                if type(key) is str:
+                    key = intern(key)
+                if type(value) is str:
+                    if key in _INTERNED_VALUE_KEYS:
+                        value = intern(value)
+                elif key == 'enum' and type(value) is list:
+                    value = [intern(item) if type(item) is str else item for item in value]
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
+                node[key] = value
+        elif isinstance(node, list):
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
+
+    return spec
+
+
+@functools.lru_cache(maxsize=32)
+def _load_spec_cached(path_str: str, mtime_ns: int, size: int) -> Dict:
+    """
+    按(路径, 修改时间, 大小)缓存解析结果，文件修改后自动重新解析
+
+    返回的spec（字符串键已驻留）在多个SwaggerParser实例间共享，调用方不应修改
+    """
+    return _intern_strings(SwaggerParser._load_spec_file(Path(path_str), mtime_ns, size))
+
+
+class Parameter:
+    """
+    接口参数
+
+    使用__slots__减少大量参数对象的内存占用；同时支持按键读取
+    （param['name']、param.get('schema')），兼容原有的字典访问方式
+    """
+
+    __slots__ = ('name', 'in_', 'required', 'description', 'schema', 'example')
+
+    # 字典键 -> 属性名（'in'是关键字，属性名为in_）
+    _KEY_MAP = {
+        'name': 'name',
+        'in': 'in_',
+        'required': 'required',
+        'description': 'description',
+        'schema': 'schema',
+        'example': 'example',
+    }
+
+    def __init__(
+            self,
+            name: Optional[str],
+            in_: Optional[str],
+            required: bool = False,
+            description: str = '',
+            schema: Optional[Dict] = None,
+            example: Any = None
+    ):
+        self.name = name
+        self.in_ = in_  # query, header, path, cookie
+        self.required = required
+        self.description = description
+        self.schema = schema if schema is not None else {}
+        self.example = example
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, self._KEY_MAP[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._KEY_MAP
+
+    def get(self, key: str, default: Any = None) -> Any:
+        attr = self._KEY_MAP.get(key)
+        return getattr(self, attr) if attr else default
+
+    def as_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {key: getattr(self, attr) for key, attr in self._KEY_MAP.items()}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Parameter):
+            return self.as_dict() == other.as_dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Parameter(name={self.name!r}, in_={self.in_!r}, required={self.required!r})"
+
+
+@dataclass
+class EndpointTable:
+    """端点的列式视图：常用字段按端点顺序存放在并行列表中"""
+    paths: List[str] = field(default_factory=list)
+    methods: List[str] = field(default_factory=list)
+    operation_ids: List[str] = field(default_factory=list)
+    tags: List[List[str]] = field(default_factory=list)
+    deprecated: List[bool] = field(default_factory=list)
+    keys: List[str] = field(default_factory=list)  # "METHOD /path"
+    endpoints: List[Dict[str, Any]] = field(default_factory=list)  # 完整的端点字典
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self.endpoints[index]
+
+    def active_indices(self) -> List[int]:
+        """未废弃端点的下标"""
+        return [i for i, is_deprecated in enumerate(self.deprecated) if not is_deprecated]
+
 
 class SwaggerParser:
     """统一的Swagger/OpenAPI解析器"""
@@ -22,45 +176,78 @@ class SwaggerParser:
         self.spec = self._load_spec()
         self.version = self._detect_version()
         self.base_url = self._get_base_url()
+        self._endpoints_cache: Optional[List[Dict[str, Any]]] = None
+        self._endpoint_table: Optional[EndpointTable] = None
+        self._ref_cache: Dict[str, Any] = {}
+
+    @classmethod
+    def cache_clear(cls):
+        """清空进程内的规范解析缓存"""
+        _load_spec_cached.cache_clear()
 
     def _load_spec(self) -> Dict:
-        """加载并解析Swagger文件"""
-        with open(self.spec_path, 'r', encoding='utf-8') as f:
+        """加载并解析Swagger文件（进程内按路径和修改时间缓存）"""
+        stat = self.spec_path.stat()
+        return _load_spec_cached(str(self.spec_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+    @classmethod
+    def _load_spec_file(cls, spec_path: Path, mtime_ns: int, size: int) -> Dict:
+        """加载并解析Swagger文件（YAML文件的解析结果缓存在JSON旁路文件中）"""
+        is_json = spec_path.suffix.lower() == '.json'
+
+        # 缓存头记录源文件的修改时间和大小，源文件变化后缓存自动失效
+        cache_path = cache_path_for(spec_path)
+        cache_header = cache_header_for(mtime_ns, size)
+
+        if not is_json:
+            cached = read_json_cache(cache_path, cache_header)
+            if cached is not None:
+                return cached
+
+        spec = cls._parse_spec_file(spec_path)
+
+        if not is_json:
+            write_json_cache(cache_path, cache_header, spec)
+
+        return spec
+
+    @staticmethod
+    def _parse_spec_file(spec_path: Path) -> Dict:
+        """解析Swagger文件"""
+        with open(spec_path, 'r', encoding='utf-8') as f:
             content = f.read()
 
         # 根据文件扩展名选择解析方式
-        if self.spec_path.suffix.lower() in ['.yaml', '.yml']:
-            return yaml.safe_load(content)
-        elif self.spec_path.suffix.lower() == '.json':
+        suffix = spec_path.suffix.lower()
+        if suffix in _YAML_SUFFIXES:
+            return yaml.load(content, Loader=YamlLoader)
+        elif suffix == '.json':
             return json.loads(content)
         else:
             # 尝试YAML，失败则尝试JSON
             try:
-                return yaml.safe_load(content)
+                return yaml.load(content, Loader=YamlLoader)
             except yaml.YAMLError:
                 return json.loads(content)
 
     def _detect_version(self) -> str:
         """检测Swagger/OpenAPI版本"""
-        if 'openapi' in self.spec:
-            version = self.spec['openapi']
+        # 每个字段只查找一次（get代替in加下标）
+        if (version := self.spec.get('openapi')) is not None:
             return f"OpenAPI {version}"
-        elif 'swagger' in self.spec:
-            version = self.spec['swagger']
+        if (version := self.spec.get('swagger')) is not None:
             return f"Swagger {version}"
-        else:
-            raise ValueError("无法识别的API规范格式，请确保文件包含'openapi'或'swagger'字段")
+        raise ValueError("无法识别的API规范格式，请确保文件包含'openapi'或'swagger'字段")
 
     def _get_base_url(self) -> str:
         """获取API基础URL"""
         # OpenAPI 3.0+
-        if 'servers' in self.spec and self.spec['servers']:
-            return self.spec['servers'][0]['url']
+        if servers := self.spec.get('servers'):
+            return servers[0]['url']
 
         # Swagger 2.0
-        if 'host' in self.spec:
+        if (host := self.spec.get('host')) is not None:
             scheme = self.spec.get('schemes', ['http'])[0]
-            host = self.spec['host']
             base_path = self.spec.get('basePath', '')
             return f"{scheme}://{host}{base_path}"
 
@@ -82,35 +269,78 @@ class SwaggerParser:
             - responses: 响应定义
             - security: 安全要求
             - tags: 标签
+
+            结果在实例上缓存，重复调用返回同一个列表，调用方不应修改
+        """
+        if self._endpoints_cache is None:
+            self._endpoints_cache = list(self.iter_endpoints())
+        return self._endpoints_cache
+
+    def iter_endpoints(self) -> Iterator[Dict[str, Any]]:
+        """
+        逐个生成API端点信息（字段同get_all_endpoints）
+
+        只需遍历一次的调用方（计数、按方法或标签过滤）不必构建完整列表；
+        get_all_endpoints已缓存时直接遍历缓存
         """
-        endpoints = []
+        if self._endpoints_cache is not None:
+            yield from self._endpoints_cache
+            return
+
         paths = self.spec.get('paths', {})
 
-        for path, path_item in paths.items():
-            # HTTP方法列表
-            methods = ['get', 'post', 'put', 'delete', 'patch', 'options', 'head', 'trace']
+        # 全局security在所有操作间共用，只查找一次
+        default_security = self.spec.get('security', [])
 
+        for path, path_item in paths.items():
+            # 一次集合求交得到该路径实际定义的方法，再按固定顺序排列
+            methods = sorted(_HTTP_METHOD_SET.intersection(path_item), key=_HTTP_METHOD_ORDER.__getitem__)
             for method in methods:
-                if method in path_item:
-                    operation = path_item[method]
-                    endpoint_info = {
-                        'path': path,
-                        'method': method.upper(),
-                        'operation_id': operation.get('operationId', f"{method}_{path.replace('/', '_')}"),
-                        'summary': operation.get('summary', ''),
-                        'description': operation.get('description', ''),
-                        'parameters': self._parse_parameters(operation, path_item),
-                        'request_body': self._parse_request_body(operation),
-                        'responses': operation.get('responses', {}),
-                        'security': operation.get('security', self.spec.get('security', [])),
-                        'tags': operation.get('tags', []),
-                        'deprecated': operation.get('deprecated', False)
-                    }
-                    endpoints.append(endpoint_info)
+                operation = path_item[method]
+
+                # 只有缺少operationId时才构造默认值
+                operation_id = operation.get('operationId')
+                if operation_id is None:
+                    operation_id = f"{method}_{path.translate(_SLASH_TO_UNDERSCORE)}"
+
+                endpoint_info = {
+                    'path': path,
+                    'method': method.upper(),
+                    'operation_id': operation_id,
+                    'summary': operation.get('summary', ''),
+                    'description': operation.get('description', ''),
+                    'parameters': self._parse_parameters(operation, path_item),
+                    'request_body': self._parse_request_body(operation),
+                    'responses': operation.get('responses', {}),
+                    'security': operation.get('security', default_security),
+                    'tags': operation.get('tags', []),
+                    'deprecated': operation.get('deprecated', False)
+                }
+                yield endpoint_info
 
-        return endpoints
+    def get_endpoint_table(self) -> EndpointTable:
+        """
+        获取端点的列式视图（一次遍历构建，结果在实例上缓存）
 
-    def _parse_parameters(self, operation: Dict, path_item: Dict) -> List[Dict]:
+        适合只需要按方法、路径、标签等字段过滤端点的调用方
+        """
+        if self._endpoint_table is not None:
+            return self._endpoint_table
+
+        table = EndpointTable()
+        for endpoint in self.get_all_endpoints():
+            table.paths.append(endpoint['path'])
+            table.methods.append(endpoint['method'])
+            table.operation_ids.append(endpoint['operation_id'])
+            table.tags.append(endpoint['tags'])
+            table.deprecated.append(endpoint['deprecated'])
+            table.keys.append(f"{endpoint['method']} {endpoint['path']}")
+            table.endpoints.append(endpoint)
+
+        self._endpoint_table = table
+        return table
+
+    def _parse_parameters(self, operation: Dict, path_item: Dict) -> List[Parameter]:
         """
         解析参数（兼容Swagger 2.0和OpenAPI 3.0+）
 
@@ -123,42 +353,28 @@ class SwaggerParser:
         """
         parameters = []
 
-        # 合并path级别和operation级别的参数
-        path_params = path_item.get('parameters', [])
-        op_params = operation.get('parameters', [])
-
-        all_params = path_params + op_params
-
-        for param in all_params:
-            # 处理$ref引用（简化处理）
+        # 依次遍历path级别和operation级别的参数（不拼接新列表）
+        for param in chain(path_item.get('parameters', ()), operation.get('parameters', ())):
+            # 解析参数本身及其schema中的$ref，无法解析的引用跳过
+            param = self._resolve_refs(param)
             if '$ref' in param:
-                # TODO: 实现$ref解析
                 continue
 
             # OpenAPI 3.0+: schema在param.schema中
-            # Swagger 2.0: type直接在param中
-            schema = param.get('schema', {})
+            # Swagger 2.0: type直接在param中，只保留实际定义的约束
+            schema = param.get('schema')
             if not schema:
-                # Swagger 2.0格式
-                schema = {
-                    'type': param.get('type'),
-                    'format': param.get('format'),
-                    'enum': param.get('enum'),
-                    'minimum': param.get('minimum'),
-                    'maximum': param.get('maximum'),
-                    'minLength': param.get('minLength'),
-                    'maxLength': param.get('maxLength'),
-                }
-
-            param_info = {
-                'name': param.get('name'),
-                'in': param.get('in'),  # query, header, path, cookie
-                'required': param.get('required', False),
-                'description': param.get('description', ''),
-                'schema': schema,
-                'example': param.get('example'),
-            }
-            parameters.append(param_info)
+                schema = {key: param[key] for key in _SWAGGER2_SCHEMA_KEYS if key in param}
+
+            get = param.get
+            parameters.append(Parameter(
+                name=get('name'),
+                in_=get('in'),
+                required=get('required', False),
+                description=get('description', ''),
+                schema=schema,
+                example=get('example'),
+            ))
 
         return parameters
 
@@ -175,7 +391,7 @@ class SwaggerParser:
         """
         # OpenAPI 3.0+
         if 'requestBody' in operation:
-            request_body = operation['requestBody']
+            request_body = self._resolve_refs(operation['requestBody'])
             content = request_body.get('content', {})
 
             # 优先使用application/json
@@ -190,17 +406,100 @@ class SwaggerParser:
 
         # Swagger 2.0: 检查parameters中的body参数
         for param in operation.get('parameters', []):
+            if '$ref' in param:
+                param = self._resolve_refs(param)
             if param.get('in') == 'body':
                 return {
                     'required': param.get('required', False),
                     'content_type': 'application/json',
-                    'schema': param.get('schema', {}),
+                    'schema': self._resolve_refs(param.get('schema', {})),
                 }
 
         return None
 
-    def get_security_definitions(self) -> Dict:
-        """获取安全定义"""
+    def _resolve_refs(self, node: Any) -> Any:
+        """
+        返回将$ref替换为引用目标后的副本（不修改self.spec）
+
+        使用显式栈迭代遍历，深层嵌套的schema不会超出递归深度；
+        每个节点记录展开路径上已经过的引用，遇到循环引用时保留原$ref对象
+
+        Args:
+            node: 参数、请求体或schema
+
+        Returns:
+            解析后的副本
+        """
+        holder = [None]
+        # 栈帧: (父容器, 键或下标, 原节点, 展开路径上的引用)
+        stack = [(holder, 0, node, frozenset())]
+
+        while stack:
+            container, key, value, active = stack.pop()
+
+            # 沿引用链找到最终目标（引用另一个引用的情况）
+            while isinstance(value, dict) and '$ref' in value:
+                ref = value['$ref']
+                if ref in active:
+                    break
+                target = self._lookup_ref(ref)
+                if target is None:
+                    break
+                active = active | {ref}
+                value = target
+
+            # 先整体浅复制保持键的顺序，再将子容器替换为解析后的副本
+            if isinstance(value, dict):
+                resolved = dict(value)
+                for child_key, child in value.items():
+                    if isinstance(child, (dict, list)):
+                        stack.append((resolved, child_key, child, active))
+            elif isinstance(value, list):
+                resolved = list(value)
+                for index, child in enumerate(value):
+                    if isinstance(child, (dict, list)):
+                        stack.append((resolved, index, child, active))
+            else:
+                resolved = value
+
+            container[key] = resolved
+
+        return holder[0]
+
+    def _lookup_ref(self, ref: Any) -> Any:
+        """
+        查找文档内引用（如 #/definitions/Pet）指向的节点，结果按引用缓存
+
+        Returns:
+            引用目标，外部引用或目标不存在时返回None
+        """
+        try:
+            return self._ref_cache[ref]
+        except (KeyError, TypeError):
+            pass
+
+        if not isinstance(ref, str) or not ref.startswith('#/'):
+            return None
+
+        node = self.spec
+        for part in ref[2:].split('/'):
+            # JSON Pointer转义：~1表示'/'，~0表示'~'
+            part = part.replace('~1', '/').replace('~0', '~')
+            if isinstance(node, dict):
+                node = node.get(part)
+            elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+                node = node[int(part)]
+            else:
+                node = None
+            if node is None:
+                break
+
+        self._ref_cache[ref] = node
+        return node
+
+    @functools.cached_property
+    def security_definitions(self) -> Dict:
+        """安全定义（首次访问时查找，之后在实例上缓存）"""
         # OpenAPI 3.0+
         if 'components' in self.spec and 'securitySchemes' in self.spec['components']:
             return self.spec['components']['securitySchemes']
@@ -211,8 +510,9 @@ class SwaggerParser:
 
         return {}
 
-    def get_api_info(self) -> Dict[str, str]:
-        """获取API基本信息"""
+    @functools.cached_property
+    def api_info(self) -> Dict[str, str]:
+        """API基本信息（首次访问时构建，之后在实例上缓存）"""
         info = self.spec.get('info', {})
         return {
             'title': info.get('title', 'Unknown API'),
@@ -223,9 +523,10 @@ class SwaggerParser:
             'contact': info.get('contact', {}),
         }
 
-    def get_definitions(self) -> Dict:
+    @functools.cached_property
+    def definitions(self) -> Dict:
         """
-        获取数据模型定义
+        数据模型定义（首次访问时查找，之后在实例上缓存）
 
         Returns:
             模型定义字典
@@ -239,3 +540,20 @@ class SwaggerParser:
             return self.spec['definitions']
 
         return {}
+
+    def get_security_definitions(self) -> Dict:
+        """获取安全定义"""
+        return self.security_definitions
+
+    def get_api_info(self) -> Dict[str, str]:
+        """获取API基本信息"""
+        return self.api_info
+
+    def get_definitions(self) -> Dict:
+        """
+        获取数据模型定义
+
+        Returns:
+            模型定义字典
+        """
+        return self.definitions
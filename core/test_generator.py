@@ -2,13 +2,144 @@
 测试用例生成器 - 根据API定义自动生成测试用例
 """
 
-from typing import Dict, List, Any
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Any, Iterator, Optional, Sequence, Tuple
 from .data_generator import DataGenerator
 
 
+# 生成用例时放入请求的参数位置 -> 测试用例中的字段名
+_PARAM_LOCATIONS = {
+    'path': 'path_params',
+    'query': 'query_params',
+    'header': 'headers',
+}
+
+# _build_request_params中表示"省略该参数"
+_OMIT = object()
+
+# 各类用例的期望状态码（所有用例共用的不可变元组）
+_POSITIVE_STATUS = (200, 201, 204)
+_ERROR_STATUS = (400, 422)
+_UNAUTHORIZED_STATUS = (401,)
+_SECURITY_STATUS = (400, 422, 500)  # 应该被拦截或安全处理
+_SCHEMA_STATUS = {'200': (200,), '201': (201,)}
+
+# 每个端点生成的安全测试用例数
+_SECURITY_PAYLOAD_LIMIT = 3
+
+
+@dataclass(frozen=True)
+class _EndpointIndex:
+    """单个端点的参数索引，生成用例前构建一次，各类用例共用"""
+    params: List[Any]  # endpoint['parameters']
+    params_by_name: Dict[str, List[str]]  # 参数名 -> 该参数所在的用例字段（path_params/query_params/headers）
+    params_by_in: Dict[str, Dict[str, Any]]  # 位置 -> {参数名: 有效值}
+    required_params: List[Any]
+    string_params: List[Any]
+    valid_values: List[Any]  # 与params按下标对应
+    valid_body: Any
+
+
+class TestCase:
+    """
+    测试用例
+
+    使用__slots__减少大量用例对象的内存占用；同时支持按键读取
+    （case['method']、case.get('body')），兼容原有的字典访问方式
+    """
+
+    __slots__ = (
+        'id', 'name', 'type', 'priority', 'method', 'path',
+        'path_params', 'query_params', 'headers', 'body',
+        'expected_status_codes', 'validate_schema', 'strict_schema',
+        'skip_auth', 'parse_body', 'use_head', 'description',
+    )
+
+    _FIELDS = frozenset(__slots__)
+
+    def __init__(
+            self,
+            id: str,
+            name: str,
+            type: str,
+            priority: str,
+            method: str,
+            path: str,
+            path_params: Optional[Dict] = None,
+            query_params: Optional[Dict] = None,
+            headers: Optional[Dict] = None,
+            body: Any = None,
+            expected_status_codes: Sequence[int] = (),
+            validate_schema: bool = False,
+            strict_schema: bool = False,
+            skip_auth: bool = False,
+            parse_body: bool = False,
+            use_head: bool = False,
+            description: str = ''
+    ):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.priority = priority
+        self.method = method
+        self.path = path
+        self.path_params = path_params if path_params is not None else {}
+        self.query_params = query_params if query_params is not None else {}
+        self.headers = headers if headers is not None else {}
+        self.body = body
+        self.expected_status_codes = expected_status_codes
+        self.validate_schema = validate_schema
+        self.strict_schema = strict_schema
+        self.skip_auth = skip_auth
+        self.parse_body = parse_body
+        self.use_head = use_head
+        self.description = description
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._FIELDS else default
+
+    def as_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def replace(self, **changes) -> 'TestCase':
+        """复制用例并修改指定字段（嵌套的参数字典共用）"""
+        fields = self.as_dict()
+        fields.update(changes)
+        return TestCase(**fields)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TestCase):
+            return self.as_dict() == other.as_dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TestCase(id={self.id!r}, method={self.method!r}, path={self.path!r})"
+
+
 class TestGenerator:
     """自动生成API测试用例"""
 
+    # 各类型参数对应的错误类型取值
+    _WRONG_TYPE = {
+        'string': 12345,  # 返回数字而不是字符串
+        'integer': "not_a_number",  # 返回字符串而不是数字
+        'number': "not_a_number",
+        'boolean': "not_a_boolean",
+        'array': "not_an_array",
+        'object': "not_an_object",
+    }
+
     def __init__(self, data_generator: DataGenerator = None):
         """
         初始化测试生成器
@@ -18,97 +149,226 @@ class TestGenerator:
         """
         self.data_gen = data_generator or DataGenerator()
 
-    def generate_test_cases(self, endpoint: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # 参数/请求体定义相同的端点共用生成结果：
+        # 形状哈希 -> (来源端点, 正向及必填参数用例, 类型验证及边界值用例, 安全测试用例)
+        self._case_cache: Dict[str, Tuple[Dict, List[TestCase], List[TestCase], List[TestCase]]] = {}
+
+        # 安全测试使用的恶意payload（与端点无关，首次使用时获取一次）
+        self._malicious_payloads: Optional[Tuple[str, ...]] = None
+
+    def generate_test_cases(self, endpoint: Dict[str, Any], skip_duplicate_shapes: bool = False) -> List[TestCase]:
         """
         为单个API端点生成全面的测试用例
 
         Args:
             endpoint: 端点信息字典（来自SwaggerParser.get_all_endpoints()）
+            skip_duplicate_shapes: 参数和请求体定义与之前的端点相同时，跳过类型验证和边界值用例
 
         Returns:
             测试用例列表
         """
-        test_cases = []
+        return list(self.iter_test_cases(endpoint, skip_duplicate_shapes))
+
+    def iter_test_cases(self, endpoint: Dict[str, Any], skip_duplicate_shapes: bool = False) -> Iterator[TestCase]:
+        """
+        逐个生成单个API端点的测试用例（用例同generate_test_cases）
+
+        调用方可以边生成边执行，不必先构建所有端点的用例列表
+
+        Args:
+            endpoint: 端点信息字典（来自SwaggerParser.get_all_endpoints()）
+            skip_duplicate_shapes: 参数和请求体定义与之前的端点相同时，跳过类型验证和边界值用例
+        """
+        # 只依赖参数和请求体的用例：相同定义的端点复用已生成的用例，
+        # 只替换端点相关的字段（ID、方法、路径等）
+        key = self._shape_key(endpoint)
+        cached = self._case_cache.get(key)
+        if cached is None:
+            index = self._build_index(endpoint)
+
+            base_cases = []
+            # 1. 正向测试用例
+            base_cases.extend(self._generate_positive_cases(endpoint, index))
 
-        # 1. 正向测试用例
-        test_cases.extend(self._generate_positive_cases(endpoint))
+            # 2. 必填参数验证用例
+            base_cases.extend(self._generate_required_param_cases(endpoint, index))
 
-        # 2. 必填参数验证用例
-        test_cases.extend(self._generate_required_param_cases(endpoint))
+            variant_cases = []
+            # 3. 参数类型验证用例
+            variant_cases.extend(self._generate_type_validation_cases(endpoint, index))
 
-        # 3. 参数类型验证用例
-        test_cases.extend(self._generate_type_validation_cases(endpoint))
+            # 4. 边界值测试用例
+            variant_cases.extend(self._generate_boundary_cases(endpoint, index))
 
-        # 4. 边界值测试用例
-        test_cases.extend(self._generate_boundary_cases(endpoint))
+            security_cases = self._generate_security_cases(endpoint, index)
+
+            source = endpoint
+            self._case_cache[key] = (source, base_cases, variant_cases, security_cases)
+        else:
+            source, base_cases, variant_cases, security_cases = cached
+            if skip_duplicate_shapes:
+                variant_cases = []
+
+        yield from self._stamped(base_cases, source, endpoint)
+        yield from self._stamped(variant_cases, source, endpoint)
 
         # 5. 认证测试用例
         if endpoint.get('security'):
-            test_cases.extend(self._generate_auth_cases(endpoint))
+            yield from self._generate_auth_cases(endpoint)
 
         # 6. 响应Schema验证用例
-        test_cases.extend(self._generate_schema_validation_cases(endpoint))
+        yield from self._generate_schema_validation_cases(endpoint)
 
         # 7. 安全测试用例（可选）
-        test_cases.extend(self._generate_security_cases(endpoint))
-
-        return test_cases
-
-    def _generate_positive_cases(self, endpoint: Dict) -> List[Dict]:
-        """生成正向测试用例（P0）"""
-        cases = []
+        yield from self._stamped(security_cases, source, endpoint)
+
+    def _stamped(self, cases: List[TestCase], source: Dict, endpoint: Dict) -> Iterator[TestCase]:
+        """为source端点生成的用例：endpoint是source时原样返回，否则逐个改写为endpoint的用例"""
+        if source is endpoint:
+            return iter(cases)
+        return (self._restamp_case(case, source, endpoint) for case in cases)
+
+    def _shape_key(self, endpoint: Dict) -> str:
+        """端点参数和请求体定义的哈希（作为用例缓存的键）"""
+        params = [
+            p.as_dict() if hasattr(p, 'as_dict') else p
+            for p in endpoint.get('parameters', [])
+        ]
+        shape = json.dumps(
+            {'params': params, 'body': endpoint.get('request_body')},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.blake2b(shape.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _restamp_case(self, case: TestCase, source: Dict, endpoint: Dict) -> TestCase:
+        """将为source端点生成的用例复制一份，改写为endpoint的用例"""
+        stamped = case.replace(
+            # ID格式为 TC-{operation_id}-{类型}-{序号}
+            id=f"TC-{endpoint['operation_id']}-{case.id[len(source['operation_id']) + 4:]}",
+            method=endpoint['method'],
+            path=endpoint['path'],
+        )
+        if case.type == '正向测试':
+            stamped.name = self._positive_name(endpoint)
+            stamped.description = self._positive_description(endpoint)
+        return stamped
+
+    def _positive_name(self, endpoint: Dict) -> str:
+        """正向测试用例的名称"""
+        return f"正向测试: {endpoint['summary'] or endpoint['path']}"
+
+    def _positive_description(self, endpoint: Dict) -> str:
+        """正向测试用例的描述"""
+        return f"验证{endpoint['method']} {endpoint['path']}接口在有效输入下能正常工作"
+
+    def _build_index(self, endpoint: Dict) -> _EndpointIndex:
+        """
+        一次遍历端点参数，生成各参数的有效数据并按名称、位置分组
 
-        # 生成有效的请求数据
-        query_params = {}
-        path_params = {}
-        headers = {}
-        body = None
+        每个参数和请求体的有效数据只生成一次，各类用例共用
+        """
+        params = endpoint.get('parameters', [])
+        params_by_name = {}
+        params_by_in = {location: {} for location in _PARAM_LOCATIONS}
+        required_params = []
+        string_params = []
+        valid_values = []
+
+        for param in params:
+            value = self.data_gen.generate_from_schema(param['schema'], valid=True)
+            valid_values.append(value)
+
+            location = param['in']
+            if location in params_by_in:
+                params_by_in[location][param['name']] = value
+                params_by_name.setdefault(param['name'], []).append(_PARAM_LOCATIONS[location])
+
+            if param.get('required'):
+                required_params.append(param)
+            if param.get('schema', {}).get('type') == 'string':
+                string_params.append(param)
 
-        for param in endpoint.get('parameters', []):
-            param_name = param['name']
-            param_in = param['in']
-            schema = param['schema']
+        request_body = endpoint.get('request_body')
+        valid_body = (
+            self.data_gen.generate_from_schema(request_body.get('schema', {}), valid=True)
+            if request_body else None
+        )
+
+        return _EndpointIndex(
+            params=params,
+            params_by_name=params_by_name,
+            params_by_in=params_by_in,
+            required_params=required_params,
+            string_params=string_params,
+            valid_values=valid_values,
+            valid_body=valid_body,
+        )
+
+    def _build_request_params(self, index: _EndpointIndex, name: str = None, value: Any = _OMIT) -> Dict[str, Dict]:
+        """
+        基于有效数据构建各位置的请求参数
 
-            # 生成有效数据
-            value = self.data_gen.generate_from_schema(schema, valid=True)
+        Args:
+            index: 端点参数索引
+            name: 要替换的参数名（None表示全部使用有效数据）
+            value: 替换后的值，_OMIT表示省略该参数
 
-            if param_in == 'query':
-                query_params[param_name] = value
-            elif param_in == 'path':
-                path_params[param_name] = value
-            elif param_in == 'header':
-                headers[param_name] = value
+        Returns:
+            {'path_params': {...}, 'query_params': {...}, 'headers': {...}}
+        """
+        request_params = {
+            field_name: dict(index.params_by_in[location])
+            for location, field_name in _PARAM_LOCATIONS.items()
+        }
+
+        for field_name in index.params_by_name.get(name, ()):
+            target = request_params[field_name]
+            if value is _OMIT:
+                target.pop(name, None)
+            else:
+                target[name] = value
+
+        return request_params
+
+    def _override_param(self, template: Dict[str, Dict], index: _EndpointIndex, name: str, value: Any) -> Dict[str, Dict]:
+        """复制全部有效数据的模板（_build_request_params(index)的结果），只改写指定参数"""
+        request_params = {field_name: values.copy() for field_name, values in template.items()}
+        for field_name in index.params_by_name.get(name, ()):
+            request_params[field_name][name] = value
+        return request_params
+
+    def _generate_positive_cases(self, endpoint: Dict, index: _EndpointIndex) -> List[TestCase]:
+        """生成正向测试用例（P0）"""
+        cases = []
 
-        # 处理请求体
-        request_body = endpoint.get('request_body')
-        if request_body:
-            body_schema = request_body.get('schema', {})
-            body = self.data_gen.generate_from_schema(body_schema, valid=True)
-
-        cases.append({
-            'id': f"TC-{endpoint['operation_id']}-POS-001",
-            'name': f"正向测试: {endpoint['summary'] or endpoint['path']}",
-            'type': '正向测试',
-            'priority': 'P0',
-            'method': endpoint['method'],
-            'path': endpoint['path'],
-            'path_params': path_params,
-            'query_params': query_params,
-            'headers': headers,
-            'body': body,
-            'expected_status_codes': [200, 201, 204],
-            'validate_schema': True,
-            'description': f"验证{endpoint['method']} {endpoint['path']}接口在有效输入下能正常工作"
-        })
+        # 使用预先生成的有效请求数据
+        request_params = self._build_request_params(index)
+
+        cases.append(TestCase(
+            id=f"TC-{endpoint['operation_id']}-POS-001",
+            name=self._positive_name(endpoint),
+            type='正向测试',
+            priority='P0',
+            method=endpoint['method'],
+            path=endpoint['path'],
+            path_params=request_params['path_params'],
+            query_params=request_params['query_params'],
+            headers=request_params['headers'],
+            body=index.valid_body,
+            expected_status_codes=_POSITIVE_STATUS,
+            validate_schema=True,
+            description=self._positive_description(endpoint)
+        ))
 
         return cases
 
-    def _generate_required_param_cases(self, endpoint: Dict) -> List[Dict]:
+    def _generate_required_param_cases(self, endpoint: Dict, index: _EndpointIndex) -> List[TestCase]:
         """生成必填参数验证用例（P1）"""
         cases = []
 
         # 获取所有必填参数
-        required_params = [p for p in endpoint.get('parameters', []) if p.get('required')]
+        required_params = list(index.required_params)
 
         # 获取请求体中的必填字段
         request_body = endpoint.get('request_body')
@@ -121,52 +381,46 @@ class TestGenerator:
             })
 
         # 为每个必填参数生成缺失测试用例
-        for param in required_params:
-            # 准备基础数据（包含所有其他参数）
-            query_params = {}
-            path_params = {}
-            headers = {}
-            body = None
+        # 同一端点的用例共用ID前缀、方法和路径
+        id_prefix = f"TC-{endpoint['operation_id']}-REQ-"
+        method, path = endpoint['method'], endpoint['path']
 
-            for p in endpoint.get('parameters', []):
-                if p['name'] == param['name']:
-                    continue  # 跳过当前要测试的必填参数
-
-                value = self.data_gen.generate_from_schema(p['schema'], valid=True)
-                if p['in'] == 'query':
-                    query_params[p['name']] = value
-                elif p['in'] == 'path':
-                    path_params[p['name']] = value
-                elif p['in'] == 'header':
-                    headers[p['name']] = value
+        for param in required_params:
+            # 基础数据包含所有其他参数，省略当前要测试的必填参数
+            request_params = self._build_request_params(index, param['name'])
 
             # 如果测试的不是body，要包含有效的body
+            body = None
             if param['name'] != 'request_body' and request_body:
-                body = self.data_gen.generate_from_schema(request_body['schema'], valid=True)
-
-            cases.append({
-                'id': f"TC-{endpoint['operation_id']}-REQ-{len(cases) + 1:03d}",
-                'name': f"缺少必填参数: {param['name']}",
-                'type': '反向测试',
-                'priority': 'P1',
-                'method': endpoint['method'],
-                'path': endpoint['path'],
-                'path_params': path_params,
-                'query_params': query_params,
-                'headers': headers,
-                'body': body,
-                'expected_status_codes': [400, 422],
-                'validate_schema': False,
-                'description': f"验证缺少必填参数'{param['name']}'时返回400/422错误"
-            })
+                body = index.valid_body
+
+            cases.append(TestCase(
+                id=f"{id_prefix}{len(cases) + 1:03d}",
+                name=f"缺少必填参数: {param['name']}",
+                type='反向测试',
+                priority='P1',
+                method=method,
+                path=path,
+                path_params=request_params['path_params'],
+                query_params=request_params['query_params'],
+                headers=request_params['headers'],
+                body=body,
+                expected_status_codes=_ERROR_STATUS,
+                validate_schema=False,
+                description=f"验证缺少必填参数'{param['name']}'时返回400/422错误"
+            ))
 
         return cases
 
-    def _generate_type_validation_cases(self, endpoint: Dict) -> List[Dict]:
+    def _generate_type_validation_cases(self, endpoint: Dict, index: _EndpointIndex) -> List[TestCase]:
         """生成类型验证用例（P1）"""
         cases = []
 
-        for param in endpoint.get('parameters', []):
+        id_prefix = f"TC-{endpoint['operation_id']}-TYPE-"
+        method, path = endpoint['method'], endpoint['path']
+        template = self._build_request_params(index)
+
+        for param in index.params:
             param_name = param['name']
             schema = param['schema']
             param_type = schema.get('type')
@@ -175,179 +429,163 @@ class TestGenerator:
             if not param_type:
                 continue
 
-            # 准备测试数据
-            query_params = {}
-            path_params = {}
-            headers = {}
-
-            for p in endpoint.get('parameters', []):
-                if p['name'] == param_name:
-                    # 为当前参数生成错误类型的数据
-                    value = self._generate_wrong_type_value(schema)
-                else:
-                    # 其他参数使用正确的数据
-                    value = self.data_gen.generate_from_schema(p['schema'], valid=True)
-
-                if p['in'] == 'query':
-                    query_params[p['name']] = value
-                elif p['in'] == 'path':
-                    path_params[p['name']] = value
-                elif p['in'] == 'header':
-                    headers[p['name']] = value
-
-            cases.append({
-                'id': f"TC-{endpoint['operation_id']}-TYPE-{len(cases) + 1:03d}",
-                'name': f"参数类型错误: {param_name}",
-                'type': '反向测试',
-                'priority': 'P1',
-                'method': endpoint['method'],
-                'path': endpoint['path'],
-                'path_params': path_params,
-                'query_params': query_params,
-                'headers': headers,
-                'body': None,
-                'expected_status_codes': [400, 422],
-                'validate_schema': False,
-                'description': f"验证参数'{param_name}'类型错误时返回400/422"
-            })
+            # 当前参数使用错误类型的数据，其他参数使用正确的数据
+            request_params = self._override_param(
+                template, index, param_name, self._generate_wrong_type_value(schema)
+            )
+
+            cases.append(TestCase(
+                id=f"{id_prefix}{len(cases) + 1:03d}",
+                name=f"参数类型错误: {param_name}",
+                type='反向测试',
+                priority='P1',
+                method=method,
+                path=path,
+                path_params=request_params['path_params'],
+                query_params=request_params['query_params'],
+                headers=request_params['headers'],
+                body=None,
+                expected_status_codes=_ERROR_STATUS,
+                validate_schema=False,
+                description=f"验证参数'{param_name}'类型错误时返回400/422"
+            ))
 
         return cases
 
-    def _generate_boundary_cases(self, endpoint: Dict) -> List[Dict]:
+    def _generate_boundary_cases(self, endpoint: Dict, index: _EndpointIndex) -> List[TestCase]:
         """生成边界值测试用例（P1）"""
         cases = []
 
-        for param in endpoint.get('parameters', []):
+        id_prefix = f"TC-{endpoint['operation_id']}-BND-"
+        method, path = endpoint['method'], endpoint['path']
+        template = self._build_request_params(index)
+
+        for param in index.params:
             param_name = param['name']
             schema = param['schema']
 
             # 生成边界值
             boundary_values = self.data_gen.generate_boundary_values(schema)
+            if not boundary_values:
+                continue
 
             for boundary in boundary_values:
-                query_params = {}
-                path_params = {}
-                headers = {}
-
-                for p in endpoint.get('parameters', []):
-                    if p['name'] == param_name:
-                        value = boundary['value']
-                    else:
-                        value = self.data_gen.generate_from_schema(p['schema'], valid=True)
-
-                    if p['in'] == 'query':
-                        query_params[p['name']] = value
-                    elif p['in'] == 'path':
-                        path_params[p['name']] = value
-                    elif p['in'] == 'header':
-                        headers[p['name']] = value
-
-                expected_status = [200, 201, 204] if boundary['expected_valid'] else [400, 422]
-
-                cases.append({
-                    'id': f"TC-{endpoint['operation_id']}-BND-{len(cases) + 1:03d}",
-                    'name': f"边界值测试: {param_name} - {boundary['description']}",
-                    'type': '边界值测试',
-                    'priority': 'P1',
-                    'method': endpoint['method'],
-                    'path': endpoint['path'],
-                    'path_params': path_params,
-                    'query_params': query_params,
-                    'headers': headers,
-                    'body': None,
-                    'expected_status_codes': expected_status,
-                    'validate_schema': boundary['expected_valid'],
-                    'description': f"验证参数'{param_name}'的{boundary['description']}"
-                })
+                # 复制全部有效数据的模板，只改写当前参数
+                request_params = self._override_param(template, index, param_name, boundary['value'])
+
+                expected_status = _POSITIVE_STATUS if boundary['expected_valid'] else _ERROR_STATUS
+
+                cases.append(TestCase(
+                    id=f"{id_prefix}{len(cases) + 1:03d}",
+                    name=f"边界值测试: {param_name} - {boundary['description']}",
+                    type='边界值测试',
+                    priority='P1',
+                    method=method,
+                    path=path,
+                    path_params=request_params['path_params'],
+                    query_params=request_params['query_params'],
+                    headers=request_params['headers'],
+                    body=None,
+                    expected_status_codes=expected_status,
+                    validate_schema=boundary['expected_valid'],
+                    description=f"验证参数'{param_name}'的{boundary['description']}"
+                ))
 
         return cases
 
-    def _generate_auth_cases(self, endpoint: Dict) -> List[Dict]:
+    def _generate_auth_cases(self, endpoint: Dict) -> List[TestCase]:
         """生成认证测试用例（P1）"""
         cases = []
 
         # 无认证信息
-        cases.append({
-            'id': f"TC-{endpoint['operation_id']}-AUTH-001",
-            'name': "无认证信息",
-            'type': '安全测试',
-            'priority': 'P1',
-            'method': endpoint['method'],
-            'path': endpoint['path'],
-            'path_params': {},
-            'query_params': {},
-            'headers': {},
-            'body': None,
-            'skip_auth': True,
-            'expected_status_codes': [401],
-            'validate_schema': False,
-            'description': "验证缺少认证信息时返回401"
-        })
+        cases.append(TestCase(
+            id=f"TC-{endpoint['operation_id']}-AUTH-001",
+            name="无认证信息",
+            type='安全测试',
+            priority='P1',
+            method=endpoint['method'],
+            path=endpoint['path'],
+            path_params={},
+            query_params={},
+            headers={},
+            body=None,
+            skip_auth=True,
+            expected_status_codes=_UNAUTHORIZED_STATUS,
+            validate_schema=False,
+            description="验证缺少认证信息时返回401"
+        ))
 
         # 无效认证信息
-        cases.append({
-            'id': f"TC-{endpoint['operation_id']}-AUTH-002",
-            'name': "无效认证信息",
-            'type': '安全测试',
-            'priority': 'P1',
-            'method': endpoint['method'],
-            'path': endpoint['path'],
-            'path_params': {},
-            'query_params': {},
-            'headers': {'Authorization': 'Bearer invalid_token_12345'},
-            'body': None,
-            'skip_auth': True,
-            'expected_status_codes': [401],
-            'validate_schema': False,
-            'description': "验证无效token时返回401"
-        })
+        cases.append(TestCase(
+            id=f"TC-{endpoint['operation_id']}-AUTH-002",
+            name="无效认证信息",
+            type='安全测试',
+            priority='P1',
+            method=endpoint['method'],
+            path=endpoint['path'],
+            path_params={},
+            query_params={},
+            headers={'Authorization': 'Bearer invalid_token_12345'},
+            body=None,
+            skip_auth=True,
+            expected_status_codes=_UNAUTHORIZED_STATUS,
+            validate_schema=False,
+            description="验证无效token时返回401"
+        ))
 
         return cases
 
-    def _generate_schema_validation_cases(self, endpoint: Dict) -> List[Dict]:
+    def _generate_schema_validation_cases(self, endpoint: Dict) -> List[TestCase]:
         """生成响应Schema验证用例（P0）"""
         cases = []
 
         # 为每个成功的响应代码生成schema验证用例
         responses = endpoint.get('responses', {})
+        id_prefix = f"TC-{endpoint['operation_id']}-SCH-"
+        method, path = endpoint['method'], endpoint['path']
+
         for status_code in ['200', '201']:
             if status_code in responses:
-                cases.append({
-                    'id': f"TC-{endpoint['operation_id']}-SCH-{status_code}",
-                    'name': f"响应Schema验证 ({status_code})",
-                    'type': 'Schema验证',
-                    'priority': 'P0',
-                    'method': endpoint['method'],
-                    'path': endpoint['path'],
-                    'path_params': {},
-                    'query_params': {},
-                    'headers': {},
-                    'body': None,
-                    'expected_status_codes': [int(status_code)],
-                    'validate_schema': True,
-                    'strict_schema': True,
-                    'description': f"验证{status_code}响应严格符合Schema定义"
-                })
+                cases.append(TestCase(
+                    id=f"{id_prefix}{status_code}",
+                    name=f"响应Schema验证 ({status_code})",
+                    type='Schema验证',
+                    priority='P0',
+                    method=method,
+                    path=path,
+                    path_params={},
+                    query_params={},
+                    headers={},
+                    body=None,
+                    expected_status_codes=_SCHEMA_STATUS[status_code],
+                    validate_schema=True,
+                    strict_schema=True,
+                    description=f"验证{status_code}响应严格符合Schema定义"
+                ))
 
         return cases
 
-    def _generate_security_cases(self, endpoint: Dict) -> List[Dict]:
+    def _generate_security_cases(self, endpoint: Dict, index: _EndpointIndex) -> List[TestCase]:
         """生成安全测试用例（P2）"""
         cases = []
 
         # 只为接受字符串输入的参数生成安全测试
-        string_params = [
-            p for p in endpoint.get('parameters', [])
-            if p.get('schema', {}).get('type') == 'string'
-        ]
+        string_params = index.string_params
 
         if not string_params:
             return cases
 
-        # 使用恶意payload测试
-        malicious_payloads = self.data_gen.generate_malicious_payloads()
+        # 使用恶意payload测试（只使用前几个，限制数量）
+        malicious_payloads = self._malicious_payloads
+        if malicious_payloads is None:
+            malicious_payloads = self._malicious_payloads = tuple(
+                self.data_gen.generate_malicious_payloads()[:_SECURITY_PAYLOAD_LIMIT]
+            )
+
+        id_prefix = f"TC-{endpoint['operation_id']}-SEC-"
+        method, path = endpoint['method'], endpoint['path']
 
-        for i, payload in enumerate(malicious_payloads[:3]):  # 限制数量
+        for i, payload in enumerate(malicious_payloads):
             # 选择一个参数进行测试
             param = string_params[0]
 
@@ -355,37 +593,27 @@ class TestGenerator:
             if param['in'] == 'query':
                 query_params[param['name']] = payload
 
-            cases.append({
-                'id': f"TC-{endpoint['operation_id']}-SEC-{i + 1:03d}",
-                'name': f"安全测试: 恶意输入 #{i + 1}",
-                'type': '安全测试',
-                'priority': 'P2',
-                'method': endpoint['method'],
-                'path': endpoint['path'],
-                'path_params': {},
-                'query_params': query_params,
-                'headers': {},
-                'body': None,
-                'expected_status_codes': [400, 422, 500],  # 应该被拦截或安全处理
-                'validate_schema': False,
-                'description': f"验证恶意输入被正确处理，不会导致安全问题"
-            })
+            cases.append(TestCase(
+                id=f"{id_prefix}{i + 1:03d}",
+                name=f"安全测试: 恶意输入 #{i + 1}",
+                type='安全测试',
+                priority='P2',
+                method=method,
+                path=path,
+                path_params={},
+                query_params=query_params,
+                headers={},
+                body=None,
+                expected_status_codes=_SECURITY_STATUS,
+                validate_schema=False,
+                description=f"验证恶意输入被正确处理，不会导致安全问题"
+            ))
 
         return cases
 
     def _generate_wrong_type_value(self, schema: Dict) -> Any:
-        """生成错误类型的值"""
+        """生成错误类型的值（未知类型返回None）"""
         schema_type = schema.get('type')
-
-        if schema_type == 'string':
-            return 12345  # 返回数字而不是字符串
-        elif schema_type in ['integer', 'number']:
-            return "not_a_number"  # 返回字符串而不是数字
-        elif schema_type == 'boolean':
-            return "not_a_boolean"
-        elif schema_type == 'array':
-            return "not_an_array"
-        elif schema_type == 'object':
-            return "not_an_object"
-        else:
+        if not isinstance(schema_type, str):
             return None
+        return self._WRONG_TYPE.get(schema_type)
@@ -4,7 +4,46 @@
 
 from typing import Dict, List, Any, Optional
 import jsonschema
-from jsonschema import validate, ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+from requests.structures import CaseInsensitiveDict
+
+
+# 已编译的schema验证器：id(schema) -> (schema, 验证器)，在所有ResponseValidator间共享
+# 同时保存schema本身，保证id不会被其他对象复用；超过上限时整体清空
+_VALIDATOR_CACHE: Dict[int, tuple] = {}
+_VALIDATOR_CACHE_SIZE = 1024
+
+# Python类型 -> JSON类型（按精确类型查表，bool不会被当作integer）
+_JSON_TYPES = {
+    type(None): 'null',
+    bool: 'boolean',
+    int: 'integer',
+    float: 'number',
+    str: 'string',
+    list: 'array',
+    dict: 'object',
+}
+
+
+def _compile_validator(schema: Dict):
+    """
+    获取schema对应的验证器（每个schema只检查和构建一次）
+
+    与jsonschema.validate相同，按$schema选择验证器类并先检查schema本身是否合法
+    """
+    entry = _VALIDATOR_CACHE.get(id(schema))
+    if entry is not None and entry[0] is schema:
+        return entry[1]
+
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+
+    if len(_VALIDATOR_CACHE) >= _VALIDATOR_CACHE_SIZE:
+        _VALIDATOR_CACHE.clear()
+    _VALIDATOR_CACHE[id(schema)] = (schema, validator)
+    return validator
 
 
 class ResponseValidator:
@@ -19,6 +58,14 @@ class ResponseValidator:
         """
         self.endpoint = endpoint
         self.responses = endpoint.get('responses', {})
+        # 每个已声明状态码的响应schema，构造时提取一次
+        self._schemas: Dict[str, Optional[Dict]] = {
+            code: self._get_response_schema(response_def)
+            for code, response_def in self.responses.items()
+            if isinstance(response_def, dict)
+        }
+        # id(schema) -> (schema, [(属性名, 期望类型), ...])，只包含声明了type的属性
+        self._typed_properties_cache: Dict[int, tuple] = {}
 
     def validate_response(
             self,
@@ -55,25 +102,30 @@ class ResponseValidator:
                 f"状态码{status_code}未在Swagger定义中声明"
             )
 
-        # 2. 获取响应定义
-        response_def = self.responses.get(status_code_str) or self.responses.get('default', {})
+        # 2. 获取响应定义及预先提取的schema
+        response_def = self.responses.get(status_code_str)
+        schema_key = status_code_str
+        if not response_def:
+            response_def = self.responses.get('default', {})
+            schema_key = 'default'
+        schema = self._schemas.get(schema_key)
 
         # 3. 验证响应Schema
         if strict_schema and response_data is not None:
-            schema_errors = self._validate_schema(response_data, response_def)
+            schema_errors = self._validate_schema(response_data, schema)
             if schema_errors:
                 result['valid'] = False
                 result['errors'].extend(schema_errors)
 
         # 4. 验证必填字段
         if isinstance(response_data, dict):
-            required_errors = self._validate_required_fields(response_data, response_def)
+            required_errors = self._validate_required_fields(response_data, schema)
             if required_errors:
                 result['valid'] = False
                 result['errors'].extend(required_errors)
 
         # 5. 验证数据类型
-        type_errors = self._validate_data_types(response_data, response_def)
+        type_errors = self._validate_data_types(response_data, schema)
         if type_errors:
             result['valid'] = False
             result['errors'].extend(type_errors)
@@ -85,23 +137,22 @@ class ResponseValidator:
 
         return result
 
-    def _validate_schema(self, data: Any, response_def: Dict) -> List[str]:
+    def _validate_schema(self, data: Any, schema: Optional[Dict]) -> List[str]:
         """使用jsonschema验证响应数据"""
         errors = []
 
-        # 获取schema定义
-        schema = self._get_response_schema(response_def)
-
         if not schema:
             return errors
 
         try:
-            # 使用jsonschema进行验证
-            validate(instance=data, schema=schema)
-        except ValidationError as e:
-            errors.append(f"Schema验证失败: {e.message} (路径: {'.'.join(str(p) for p in e.path)})")
+            # 使用缓存的验证器，取最相关的一个错误（与jsonschema.validate一致）
+            error = best_match(_compile_validator(schema).iter_errors(data))
         except Exception as e:
             errors.append(f"Schema验证异常: {str(e)}")
+            return errors
+
+        if error is not None:
+            errors.append(f"Schema验证失败: {error.message} (路径: {'.'.join(str(p) for p in error.path)})")
 
         return errors
 
@@ -121,11 +172,10 @@ class ResponseValidator:
 
         return None
 
-    def _validate_required_fields(self, data: Dict, response_def: Dict) -> List[str]:
+    def _validate_required_fields(self, data: Dict, schema: Optional[Dict]) -> List[str]:
         """验证必填字段"""
         errors = []
 
-        schema = self._get_response_schema(response_def)
         if not schema or not isinstance(data, dict):
             return errors
 
@@ -137,49 +187,67 @@ class ResponseValidator:
 
         return errors
 
-    def _validate_data_types(self, data: Any, response_def: Dict) -> List[str]:
+    def _validate_data_types(self, data: Any, schema: Optional[Dict]) -> List[str]:
         """验证数据类型"""
         errors = []
 
-        schema = self._get_response_schema(response_def)
         if not schema:
             return errors
 
-        # 验证顶层类型
+        # 既没有声明类型也没有属性时无需检查
         expected_type = schema.get('type')
-        actual_type = self._get_json_type(data)
+        has_properties = 'properties' in schema
+        if not expected_type and not has_properties:
+            return errors
 
-        if expected_type and expected_type != actual_type:
-            errors.append(
-                f"响应类型错误: 期望{expected_type}, 实际{actual_type}"
-            )
+        # 验证顶层类型
+        if expected_type:
+            actual_type = _JSON_TYPES.get(type(data)) or self._get_json_type(data)
+            if expected_type != actual_type:
+                errors.append(
+                    f"响应类型错误: 期望{expected_type}, 实际{actual_type}"
+                )
 
         # 如果是对象，验证属性类型
-        if isinstance(data, dict) and 'properties' in schema:
-            for prop_name, prop_schema in schema['properties'].items():
+        if has_properties and isinstance(data, dict):
+            get_json_type = self._get_json_type
+            for prop_name, expected_prop_type in self._typed_properties(schema):
                 if prop_name in data:
                     prop_value = data[prop_name]
-                    expected_prop_type = prop_schema.get('type')
-                    actual_prop_type = self._get_json_type(prop_value)
-
-                    if expected_prop_type and expected_prop_type != actual_prop_type:
+                    actual_prop_type = _JSON_TYPES.get(type(prop_value)) or get_json_type(prop_value)
+                    if expected_prop_type != actual_prop_type:
                         errors.append(
                             f"字段'{prop_name}'类型错误: 期望{expected_prop_type}, 实际{actual_prop_type}"
                         )
 
         return errors
 
+    def _typed_properties(self, schema: Dict) -> List[tuple]:
+        """声明了type的属性及其期望类型（每个schema只提取一次）"""
+        entry = self._typed_properties_cache.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+
+        typed = [
+            (prop_name, prop_schema['type'])
+            for prop_name, prop_schema in schema['properties'].items()
+            if isinstance(prop_schema, dict) and prop_schema.get('type')
+        ]
+        self._typed_properties_cache[id(schema)] = (schema, typed)
+        return typed
+
     def _validate_headers(self, headers: Dict, header_defs: Dict) -> List[str]:
         """验证响应头"""
         warnings = []
 
+        # 响应头名称不区分大小写：CaseInsensitiveDict可直接查找，
+        # 普通字典先建立一次小写名称映射
+        case_insensitive = isinstance(headers, CaseInsensitiveDict)
+        if not case_insensitive:
+            headers = {name.casefold(): value for name, value in headers.items()}
+
         for header_name, header_def in header_defs.items():
-            # 响应头名称不区分大小写
-            header_value = None
-            for h_name, h_value in headers.items():
-                if h_name.lower() == header_name.lower():
-                    header_value = h_value
-                    break
+            header_value = headers.get(header_name if case_insensitive else header_name.casefold())
 
             if header_def.get('required') and header_value is None:
                 warnings.append(f"缺少必需的响应头: {header_name}")
@@ -188,22 +256,15 @@ class ResponseValidator:
 
     def _get_json_type(self, value: Any) -> str:
         """获取Python值对应的JSON类型"""
-        if value is None:
-            return 'null'
-        elif isinstance(value, bool):
-            return 'boolean'
-        elif isinstance(value, int):
-            return 'integer'
-        elif isinstance(value, float):
-            return 'number'
-        elif isinstance(value, str):
-            return 'string'
-        elif isinstance(value, list):
-            return 'array'
-        elif isinstance(value, dict):
-            return 'object'
-        else:
-            return 'unknown'
+        json_type = _JSON_TYPES.get(type(value))
+        if json_type is not None:
+            return json_type
+
+        # 子类（如OrderedDict）按isinstance判断，bool需先于int
+        for python_type in (bool, int, float, str, list, dict):
+            if isinstance(value, python_type):
+                return _JSON_TYPES[python_type]
+        return 'unknown'
 
     def is_success_status(self, status_code: int) -> bool:
         """判断状态码是否表示成功"""
@@ -0,0 +1,88 @@
+"""
+YAML解析缓存 - 将YAML文件的解析结果缓存在JSON旁路文件中
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import yaml
+
+# 优先使用LibYAML的C实现，未安装libyaml时退回纯Python实现（所有YAML解析共用）
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+# 缓存文件名后缀（缓存文件与源文件放在同一目录）
+CACHE_SUFFIX = '.cache.json'
+
+
+def cache_path_for(path: Path) -> Path:
+    """源文件对应的JSON缓存文件路径"""
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def cache_header_for(mtime_ns: int, size: int) -> str:
+    """缓存头记录源文件的修改时间和大小，源文件变化后缓存自动失效"""
+    return f"# src_mtime={mtime_ns} src_size={size}\n"
+
+
+def read_json_cache(cache_path: Path, cache_header: str) -> Optional[Any]:
+    """读取JSON缓存，缓存不存在或已失效时返回None"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            if f.readline() != cache_header:
+                return None
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_cache(cache_path: Path, cache_header: str, data: Any):
+    """原子写入JSON缓存，写入失败不影响解析结果"""
+    try:
+        content = json.dumps(data, ensure_ascii=False)
+        # YAML可能包含JSON无法等价表示的内容（如整数键、日期），此时不缓存，
+        # 保证读取缓存与直接解析得到完全相同的结果
+        if json.loads(content) != data:
+            return
+
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(cache_header)
+            f.write(content)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def load_yaml_file(path: Union[str, Path]) -> Any:
+    """
+    加载YAML文件，源文件未修改时直接读取JSON缓存
+
+    Args:
+        path: YAML文件路径
+
+    Returns:
+        解析后的数据
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        yaml.YAMLError: YAML格式错误
+    """
+    path = Path(path)
+    stat = path.stat()
+    cache_path = cache_path_for(path)
+    cache_header = cache_header_for(stat.st_mtime_ns, stat.st_size)
+
+    cached = read_json_cache(cache_path, cache_header)
+    if cached is not None:
+        return cached
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.load(f, Loader=YamlLoader)
+
+    write_json_cache(cache_path, cache_header, data)
+    return data
@@ -3,11 +3,12 @@ Swagger API自动化测试框架 - 主程序入口
 """
 
 import argparse
-import yaml
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 from core.parser import SwaggerParser
 from core.test_generator import TestGenerator
@@ -15,18 +16,95 @@ from core.data_generator import DataGenerator
 from core.executor import TestExecutor
 from core.auth import AuthHandler
 from core.reporter import HtmlReporter
+from core.yaml_cache import load_yaml_file
 
 # 场景测试模块
 from scenario import ScenarioParser, ScenarioExecutor
 
+# 端点数达到该值时使用多进程生成测试用例（端点较少时进程启动开销不划算）
+_PARALLEL_GENERATION_MIN_ENDPOINTS = 64
+
+# 生成用例的子进程中使用的生成器及选项（由_init_generation_worker设置）
+_worker_test_gen = None
+_worker_skip_duplicate_shapes = False
+
+
+def _init_generation_worker(skip_duplicate_shapes: bool = False):
+    """生成用例的子进程初始化：每个进程使用独立的生成器和随机数状态"""
+    global _worker_test_gen, _worker_skip_duplicate_shapes
+    _worker_test_gen = TestGenerator(DataGenerator())
+    _worker_skip_duplicate_shapes = skip_duplicate_shapes
+
+
+def _generate_cases_in_worker(endpoint: Dict[str, Any]) -> List:
+    """在子进程中为单个端点生成测试用例"""
+    return _worker_test_gen.generate_test_cases(endpoint, _worker_skip_duplicate_shapes)
+
 
 def load_config(config_path: str) -> Dict:
-    """加载配置文件"""
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    """加载配置文件（解析结果缓存在同目录的JSON旁路文件中）"""
+    return load_yaml_file(config_path)
+
+
+def select_scenario_files(scenario_path: str, name: str = None, version: str = None) -> List[str]:
+    """
+    选择要执行的场景文件
+
+    指定了名称或版本时先只读取文件头部进行过滤，不匹配的文件不做完整解析；
+    头部中没有对应字段时（如字段写在steps之后）再完整解析文件判断。
+    目录中无法解析的文件给出警告后跳过，直接指定的文件解析失败时抛出异常
+
+    Args:
+        scenario_path: 场景文件或目录路径（目录时按文件名顺序选择其中的YAML文件）
+        name: 场景名称（可选）
+        version: 场景版本（可选）
+
+    Returns:
+        匹配的场景文件路径列表
+    """
+    path = Path(scenario_path)
+    if path.is_dir():
+        candidates = sorted(
+            str(file) for file in path.iterdir()
+            if file.suffix.lower() in ('.yaml', '.yml')
+        )
+    else:
+        candidates = [scenario_path]
 
+    if name is None and version is None:
+        return candidates
 
-def run_scenario_test(scenario_file: str, base_url: str = None, config: Dict = None, output: str = None):
+    parser = ScenarioParser()
+    selected = []
+    for scenario_file in candidates:
+        try:
+            header = parser.read_header(scenario_file)
+            if (name is not None and 'name' not in header) or \
+                    (version is not None and 'version' not in header):
+                scenario = parser.parse_file(scenario_file)
+                header = {'name': scenario.name, 'version': str(scenario.version)}
+        except ValueError as e:
+            if not path.is_dir():
+                raise
+            print(f"⚠️  跳过无法解析的场景文件 {scenario_file}: {e}")
+            continue
+
+        if name is not None and header.get('name') != name:
+            continue
+        if version is not None and header.get('version') != version:
+            continue
+        selected.append(scenario_file)
+
+    return selected
+
+
+def run_scenario_test(
+        scenario_file: str,
+        base_url: str = None,
+        config: Dict = None,
+        output: str = None,
+        max_workers: Optional[int] = None
+) -> int:
     """
     执行场景测试（2.0模式）
 
@@ -35,6 +113,10 @@ def run_scenario_test(scenario_file: str, base_url: str = None, config: Dict = N
         base_url: API基础URL
         config: 配置字典
         output: 输出报告路径
+        max_workers: 并发执行独立步骤的线程数（None表示使用配置文件中的execution设置）
+
+    Returns:
+        退出码（0表示全部步骤通过）
     """
     print("=" * 60)
     print("🚀 Swagger API自动化测试框架 2.0 - 场景测试")
@@ -60,7 +142,7 @@ def run_scenario_test(scenario_file: str, base_url: str = None, config: Dict = N
         print(f"\n❌ 场景验证失败:")
         for error in errors:
             print(f"   - {error}")
-        sys.exit(1)
+        return 1
 
     print(f"   ✓ 场景验证通过")
 
@@ -71,11 +153,17 @@ def run_scenario_test(scenario_file: str, base_url: str = None, config: Dict = N
         if auth_config.get('type') == 'http_bearer':
             auth_token = auth_config.get('token')
 
+    # 命令行--parallel或配置文件execution.parallel开启时，相互独立的查询步骤并发执行
+    if max_workers is None:
+        execution_config = config.get('execution', {}) if config else {}
+        max_workers = execution_config.get('max_workers', 5) if execution_config.get('parallel') else 1
+
     executor = ScenarioExecutor(
         base_url=base_url,
         timeout=config.get('execution', {}).get('timeout', 30) if config else 30,
         verify_ssl=config.get('execution', {}).get('verify_ssl', True) if config else True,
-        auth_token=auth_token
+        auth_token=auth_token,
+        max_workers=max_workers
     )
 
     # 4. 执行场景
@@ -115,11 +203,19 @@ def run_scenario_test(scenario_file: str, base_url: str = None, config: Dict = N
                     print(f"    {key}: {value_str}")
 
     # 如果有失败步骤，返回非0退出码
-    sys.exit(0 if result.failed_steps == 0 else 1)
+    return 0 if result.failed_steps == 0 else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    主函数（退出码由调用方处理，便于在同一进程中多次执行）
 
+    Args:
+        argv: 命令行参数（默认使用sys.argv）
 
-def main():
-    """主函数"""
+    Returns:
+        退出码（0表示全部用例通过）
+    """
     parser = argparse.ArgumentParser(
         description='Swagger API自动化测试框架',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -139,6 +235,9 @@ def main():
 
   # 场景测试使用配置文件
   python main.py --scenario scenarios/order_flow.yaml -c config/test_config.yaml
+
+  # 执行目录中名称匹配的场景
+  python main.py --scenario scenarios/ --scenario-name 用户注册登录流程
         """
     )
 
@@ -150,7 +249,7 @@ def main():
     )
     mode_group.add_argument(
         '--scenario',
-        help='场景定义文件路径（2.0场景测试模式）'
+        help='场景定义文件或目录路径（2.0场景测试模式，目录时执行其中所有场景文件）'
     )
 
     parser.add_argument(
@@ -171,7 +270,7 @@ def main():
     parser.add_argument(
         '--parallel',
         action='store_true',
-        help='并行执行测试用例'
+        help='并行执行测试用例（场景测试模式下并发执行相互独立的查询步骤）'
     )
 
     parser.add_argument(
@@ -194,7 +293,23 @@ def main():
         help='不验证SSL证书'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--skip-duplicate-shapes',
+        action='store_true',
+        help='参数和请求体定义相同的端点只生成一次类型验证和边界值用例'
+    )
+
+    parser.add_argument(
+        '--scenario-name',
+        help='只执行名称匹配的场景（2.0场景测试模式）'
+    )
+
+    parser.add_argument(
+        '--scenario-version',
+        help='只执行版本匹配的场景（2.0场景测试模式）'
+    )
+
+    args = parser.parse_args(argv)
 
     # 加载配置（如果有）
     config = {}
@@ -204,13 +319,31 @@ def main():
     # 根据模式选择执行不同的测试
     if args.scenario:
         # 2.0 场景测试模式
-        run_scenario_test(
-            scenario_file=args.scenario,
-            base_url=args.base_url,
-            config=config,
-            output=args.output
+        scenario_files = select_scenario_files(
+            args.scenario, args.scenario_name, args.scenario_version
         )
-        return
+        if not scenario_files:
+            print(f"\n❌ 没有匹配的场景文件: {args.scenario}")
+            return 1
+
+        # 目录中的某个场景文件解析失败时记为失败，继续执行其他文件
+        is_dir = Path(args.scenario).is_dir()
+        exit_code = 0
+        for scenario_file in scenario_files:
+            try:
+                exit_code |= run_scenario_test(
+                    scenario_file=scenario_file,
+                    base_url=args.base_url,
+                    config=config,
+                    output=args.output,
+                    max_workers=args.workers if args.parallel else None
+                )
+            except ValueError as e:
+                if not is_dir:
+                    raise
+                print(f"\n❌ 场景文件解析失败: {scenario_file}: {e}")
+                exit_code = 1
+        return exit_code
 
     # 1.0 单接口测试模式（原有逻辑）
     try:
@@ -230,7 +363,7 @@ def main():
         base_url = args.base_url or api_info.get('base_url')
         if not base_url:
             print("\n❌ 错误: 无法确定API基础URL，请使用-u参数指定")
-            sys.exit(1)
+            return 1
 
         print(f"   基础URL: {base_url}")
 
@@ -248,55 +381,93 @@ def main():
 
         # 4. 获取所有端点
         print(f"\n🔍 正在分析API端点...")
-        endpoints = swagger_parser.get_all_endpoints()
-        print(f"   发现 {len(endpoints)} 个API端点")
+        endpoint_table = swagger_parser.get_endpoint_table()
+        print(f"   发现 {len(endpoint_table)} 个API端点")
+
+        # 跳过已废弃的端点
+        endpoints = [endpoint_table[index] for index in endpoint_table.active_indices()]
 
-        # 5. 生成测试用例
-        print(f"\n📝 正在生成测试用例...")
         data_gen = DataGenerator()
         test_gen = TestGenerator(data_gen)
 
-        all_test_cases = []
-        for endpoint in endpoints:
-            if endpoint.get('deprecated'):
-                continue  # 跳过已废弃的端点
-
-            test_cases = test_gen.generate_test_cases(endpoint)
-            all_test_cases.extend([(endpoint, test_cases)])
-
-        total_cases = sum(len(cases) for _, cases in all_test_cases)
-        print(f"   生成 {total_cases} 个测试用例")
-
-        # 6. 执行测试
-        print(f"\n🧪 开始执行测试...")
-        print(f"   执行模式: {'并行' if args.parallel else '串行'}")
-        if args.parallel:
-            print(f"   并行线程数: {args.workers}")
-
         executor = TestExecutor(
             base_url=base_url,
             auth_handler=auth_handler,
             timeout=args.timeout,
-            verify_ssl=not args.no_ssl_verify
+            verify_ssl=not args.no_ssl_verify,
+            pool_size=max(args.workers, 10)
         )
 
-        all_results = []
-        for i, (endpoint, test_cases) in enumerate(all_test_cases, 1):
+        # 5-6. 生成并执行测试用例（边生成边执行，不预先构建全部用例）
+        print(f"\n🧪 开始生成并执行测试...")
+        print(f"   执行模式: {'并行' if args.parallel else '串行'}")
+        if args.parallel:
+            print(f"   并行线程数: {args.workers}")
+
+        case_owner = []  # 每个用例所属端点在endpoints中的下标
+        generated = [0] * len(endpoints)
+        completed = [0] * len(endpoints)
+        passed_counts = [0] * len(endpoints)
+        generation_done = [False] * len(endpoints)
+
+        def print_endpoint_result(i):
+            """显示某个端点的执行结果"""
+            endpoint = endpoints[i]
             endpoint_name = f"{endpoint['method']} {endpoint['path']}"
-            print(f"\n   [{i}/{len(all_test_cases)}] {endpoint_name} ({len(test_cases)}个用例)")
+            # 两行一次写出，避免并行执行时与其他输出交错
+            sys.stdout.write(
+                f"\n   [{i + 1}/{len(endpoints)}] {endpoint_name} ({generated[i]}个用例)\n"
+                f"        ✓ {passed_counts[i]}/{generated[i]} 通过\n"
+            )
 
-            results = executor.execute_test_suite(
-                test_cases=test_cases,
-                endpoint=endpoint,
-                parallel=args.parallel,
-                max_workers=args.workers
+        # 并行模式下端点较多时在多个进程中生成用例（map按端点顺序返回，先完成的端点可以先执行）；
+        # 进程数不超过并行线程数和CPU核数，进程池需在执行器的线程池启动前创建
+        generation_pool = None
+        if args.parallel and len(endpoints) >= _PARALLEL_GENERATION_MIN_ENDPOINTS:
+            generation_pool = ProcessPoolExecutor(
+                max_workers=min(args.workers, os.cpu_count() or 1),
+                initializer=_init_generation_worker,
+                initargs=(args.skip_duplicate_shapes,)
+            )
+            case_lists = generation_pool.map(_generate_cases_in_worker, endpoints, chunksize=8)
+        else:
+            case_lists = (
+                test_gen.iter_test_cases(endpoint, args.skip_duplicate_shapes)
+                for endpoint in endpoints
             )
 
-            all_results.extend(results)
+        def iter_cases():
+            """逐个产出(端点, 用例)，记录每个端点生成的用例数"""
+            for i, (endpoint, cases) in enumerate(zip(endpoints, case_lists)):
+                for case in cases:
+                    case_owner.append(i)
+                    generated[i] += 1
+                    yield endpoint, case
+                generation_done[i] = True
+                if completed[i] == generated[i]:
+                    print_endpoint_result(i)
+
+        def report_progress(case_index, result):
+            """端点的用例全部生成并执行完成时显示该端点的结果"""
+            i = case_owner[case_index]
+            completed[i] += 1
+            if result.passed:
+                passed_counts[i] += 1
+            if generation_done[i] and completed[i] == generated[i]:
+                print_endpoint_result(i)
+
+        try:
+            all_results = executor.execute_flat(
+                iter_cases(),
+                parallel=args.parallel,
+                max_workers=args.workers,
+                on_result=report_progress
+            )
+        finally:
+            if generation_pool is not None:
+                generation_pool.shutdown(cancel_futures=True)
 
-            # 显示进度
-            passed = sum(1 for r in results if r.passed)
-            print(f"        ✓ {passed}/{len(results)} 通过")
+        print(f"\n   共生成并执行 {len(all_results)} 个测试用例")
 
         executor.close()
 
@@ -317,34 +488,38 @@ def main():
         )
 
         # 8. 显示测试总结
-        print(f"\n" + "=" * 60)
-        print("✨ 测试完成！")
-        print("=" * 60)
-
         total = len(all_results)
         passed = sum(1 for r in all_results if r.passed)
         failed = total - passed
         pass_rate = (passed / total * 100) if total > 0 else 0
 
-        print(f"\n总用例数: {total}")
-        print(f"通过: {passed} ✓")
-        print(f"失败: {failed} ✗")
-        print(f"通过率: {pass_rate:.2f}%")
-
-        print(f"\n📄 报告已生成: {report_file}")
+        summary = [
+            "",
+            "=" * 60,
+            "✨ 测试完成！",
+            "=" * 60,
+            "",
+            f"总用例数: {total}",
+            f"通过: {passed} ✓",
+            f"失败: {failed} ✗",
+            f"通过率: {pass_rate:.2f}%",
+            "",
+            f"📄 报告已生成: {report_file}",
+        ]
+        sys.stdout.write('\n'.join(summary) + '\n')
 
         # 如果有失败用例，返回非0退出码
-        sys.exit(0 if failed == 0 else 1)
+        return 0 if failed == 0 else 1
 
     except FileNotFoundError as e:
         print(f"\n❌ 文件未找到: {e}")
-        sys.exit(1)
+        return 1
     except Exception as e:
         print(f"\n❌ 执行错误: {e}")
         import traceback
         traceback.print_exc()
-        sys.exit(1)
+        return 1
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
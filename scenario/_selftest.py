@@ -0,0 +1,155 @@
+"""
+场景模块自测代码 - 各模块直接运行（python -m scenario.xxx）时执行
+"""
+
+from .context_manager import ContextManager
+from .variable_extractor import VariableExtractor
+from .condition_evaluator import ConditionEvaluator
+from .scenario_parser import ScenarioParser
+from .scenario_executor import ScenarioExecutor
+
+
+def run_condition_evaluator():
+    """条件判断器自测"""
+    # 创建上下文
+    context = ContextManager()
+    context.set('age', 25)
+    context.set('balance', 150)
+    context.set('status', 'active')
+    context.set('roles', ['admin', 'user'])
+
+    # 创建判断器
+    evaluator = ConditionEvaluator(context)
+
+    # 测试用例
+    test_cases = [
+        ('age > 18', True),
+        ('balance >= 100', True),
+        ("status == 'active'", True),
+        ("'admin' in roles", True),
+        ('age > 18 and balance >= 100', True),
+        ('age < 18 or balance < 100', False),
+    ]
+
+    print("条件判断测试:")
+    for expr, expected in test_cases:
+        result = evaluator.evaluate(expr)
+        status = "✓" if result == expected else "✗"
+        print(f"  {status} {expr} => {result} (期望: {expected})")
+
+    # 测试response引用
+    response_data = {
+        'data': {
+            'balance': 200,
+            'status': 'active'
+        }
+    }
+
+    result = evaluator.evaluate('response.data.balance >= 100', response_data)
+    print(f"\n  response.data.balance >= 100 => {result}")
+
+
+def run_variable_extractor():
+    """变量提取器自测"""
+    extractor = VariableExtractor()
+
+    # 测试数据
+    response_data = {
+        'code': 200,
+        'message': 'success',
+        'data': {
+            'user': {
+                'id': 12345,
+                'username': 'testuser',
+                'email': 'test@example.com'
+            },
+            'items': [
+                {'id': 1, 'name': 'item1'},
+                {'id': 2, 'name': 'item2'},
+                {'id': 3, 'name': 'item3'}
+            ]
+        }
+    }
+
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Request-Id': 'req-12345',
+        'Set-Cookie': 'session_id=abc123; path=/; HttpOnly'
+    }
+
+    # 提取配置
+    extract_config = [
+        {'name': 'user_id', 'path': '$.data.user.id'},
+        {'name': 'username', 'path': '$.data.user.username'},
+        {'name': 'first_item_name', 'path': '$.data.items[0].name'},
+        {'name': 'all_item_ids', 'path': '$.data.items[*].id'},
+        {'name': 'request_id', 'header': 'X-Request-Id'},
+        {'name': 'session_id', 'cookie': 'session_id'},
+    ]
+
+    # 执行提取
+    result = extractor.extract(response_data, extract_config, headers)
+    print("提取结果:")
+    for name, value in result.items():
+        print(f"  {name}: {value}")
+
+
+def run_scenario_parser():
+    """场景解析器自测"""
+    parser = ScenarioParser()
+
+    # 测试解析示例场景文件
+    try:
+        scenario = parser.parse_file('scenarios/user_workflow_example.yaml')
+        print(f"✓ 成功解析场景: {scenario.name}")
+        print(f"  描述: {scenario.description}")
+        print(f"  步骤数: {len(scenario.steps)}")
+        print(f"  清理步骤: {len(scenario.teardown)}")
+
+        # 验证场景
+        errors = parser.validate(scenario)
+        if errors:
+            print("\n验证错误:")
+            for error in errors:
+                print(f"  - {error}")
+        else:
+            print("\n✓ 场景验证通过")
+
+    except Exception as e:
+        print(f"✗ 解析失败: {e}")
+
+
+def run_scenario_executor():
+    """场景执行器自测"""
+    # 解析场景
+    parser = ScenarioParser()
+    scenario = parser.parse_file('scenarios/user_workflow_example.yaml')
+
+    # 步骤分组：声明depends_on的修改步骤可以并发，但不与没有声明的查询步骤分到同一组
+    grouping = parser.parse({'scenario': {'name': '分组', 'steps': [
+        {'name': '创建A', 'api': 'POST /a', 'depends_on': []},
+        {'name': '创建B', 'api': 'POST /b', 'depends_on': []},
+        {'name': '查询A', 'api': 'GET /a'},
+        {'name': '查询B', 'api': 'GET /b'},
+        {'name': '创建C', 'api': 'POST /c', 'depends_on': []},
+    ]}})
+    batches = ScenarioExecutor(max_workers=4)._group_independent_steps(grouping.steps)
+    expected = [['创建A', '创建B'], ['查询A', '查询B'], ['创建C']]
+    actual = [[step.name for step in batch] for batch in batches]
+    status = "✓" if actual == expected else "✗"
+    print(f"{status} 步骤分组: {actual} (期望: {expected})")
+
+    # 执行场景
+    executor = ScenarioExecutor()
+    result = executor.execute(scenario)
+
+    # 输出结果
+    print(f"\n{'=' * 60}")
+    print(f"场景: {result.name}")
+    print(f"状态: {'✓ 通过' if result.passed else '✗ 失败'}")
+    print(f"步骤: {result.total_steps} 个")
+    print(f"  - 通过: {result.passed_steps}")
+    print(f"  - 失败: {result.failed_steps}")
+    print(f"  - 跳过: {result.skipped_steps}")
+    print(f"耗时: {result.total_time:.2f}秒")
+    print(f"{'=' * 60}")
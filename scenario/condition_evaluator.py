@@ -2,9 +2,82 @@
 条件判断器 - 求值条件表达式并选择执行分支
 """
 
+import ast
+import functools
 import re
 import operator
-from typing import Any, Dict
+from types import CodeType
+from typing import Any, Dict, Optional, Tuple
+
+# 表达式中的response.xxx引用
+_RESPONSE_REF_RE = re.compile(r'response\.([a-zA-Z0-9_.[\]]+)')
+
+# 手动解析时查找运算符：跳过引号内的字符串，in/not in须以空白分隔，
+# 符号运算符按长度优先匹配（>=先于>）
+_OPERATOR_RE = re.compile(
+    r"""'[^']*'|"[^"]*"|\s(?P<word>not\s+in|in)\s|(?P<symbol>==|!=|>=|<=|>|<)"""
+)
+
+# 手动解析时表示真/假/空值的字面量（小写）
+_TRUE_LITERALS = frozenset(('true', '1'))
+_FALSE_LITERALS = frozenset(('false', '0', 'none', 'null'))
+_NULL_LITERALS = frozenset(('none', 'null'))
+
+# 条件表达式的求值环境（每次求值复制一份，避免表达式修改共享的字典）
+_SAFE_GLOBALS = {
+    '__builtins__': {},
+    'True': True,
+    'False': False,
+    'None': None,
+    'and_': lambda a, b: a and b,
+    'or_': lambda a, b: a or b,
+    'not_': lambda a: not a,
+    'len': len,
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_path(path: str) -> Tuple[Tuple[str, Optional[int]], ...]:
+    """
+    将属性路径拆分为访问步骤（相同路径只拆分一次）
+
+    Args:
+        path: 属性路径，如 data.items[0].name
+
+    Returns:
+        (字典键, 列表下标)元组；不能作为下标的部分下标为None
+    """
+    steps = []
+    for part in path.replace('[', '.').replace(']', '').split('.'):
+        try:
+            index = int(part)
+        except ValueError:
+            index = None
+        steps.append((part, index))
+    return tuple(steps)
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_condition(expr: str) -> Optional[CodeType]:
+    """
+    编译条件表达式（相同表达式只编译一次）
+
+    Args:
+        expr: 已替换逻辑运算符的表达式
+
+    Returns:
+        代码对象；语法错误或访问下划线属性（如__class__）时返回None
+    """
+    try:
+        tree = ast.parse(expr, mode='eval')
+    except SyntaxError:
+        return None
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and node.attr.startswith('_'):
+            return None
+
+    return compile(tree, '<condition>', 'eval')
 
 
 class ConditionEvaluator:
@@ -31,7 +104,7 @@ class ConditionEvaluator:
         """
         self.context = context_manager
 
-    def evaluate(self, expression: str, response: Any = None) -> bool:
+    def evaluate(self, expression: str, response: Any = None, names: Optional[Dict[str, Any]] = None) -> bool:
         """
         求值条件表达式
 
@@ -44,6 +117,8 @@ class ConditionEvaluator:
         Args:
             expression: 条件表达式
             response: 当前步骤的响应数据（可选）
+            names: 表达式中可以直接使用的名称及其值（可选），如 {'status_code': 200}；
+                   按名称传入而不是替换到表达式文本中，相同的表达式只编译一次
 
         Returns:
             bool: 表达式结果
@@ -52,7 +127,7 @@ class ConditionEvaluator:
         resolved_expr = self._resolve_variables(expression, response)
 
         # 求值表达式
-        return self._evaluate_expression(resolved_expr)
+        return self._evaluate_expression(resolved_expr, names or {})
 
     def _resolve_variables(self, expr: str, response: Any) -> str:
         """
@@ -79,8 +154,6 @@ class ConditionEvaluator:
         if not response:
             return expr
 
-        pattern = r'response\.([a-zA-Z0-9_.[\]]+)'
-
         def replacer(match):
             path = match.group(1)
             value = self._get_nested_value(response, path)
@@ -90,7 +163,7 @@ class ConditionEvaluator:
             else:
                 return str(value)
 
-        return re.sub(pattern, replacer, expr)
+        return _RESPONSE_REF_RE.sub(replacer, expr)
 
     def _get_nested_value(self, data: Any, path: str) -> Any:
         """
@@ -101,17 +174,16 @@ class ConditionEvaluator:
         if not path:
             return data
 
-        parts = path.replace('[', '.').replace(']', '').split('.')
-
         current = data
-        for part in parts:
+        for key, index in _compile_path(path):
             if isinstance(current, dict):
-                current = current.get(part)
+                current = current.get(key)
             elif isinstance(current, list):
+                if index is None:
+                    return None
                 try:
-                    index = int(part)
                     current = current[index]
-                except (ValueError, IndexError):
+                except IndexError:
                     return None
             else:
                 return None
@@ -121,36 +193,35 @@ class ConditionEvaluator:
 
         return current
 
-    def _evaluate_expression(self, expr: str) -> bool:
+    def _evaluate_expression(self, expr: str, names: Dict[str, Any]) -> bool:
         """
         求值解析后的表达式
 
-        使用Python的eval（有安全限制）
+        使用Python的eval（有安全限制），编译结果按表达式缓存
+
+        Args:
+            expr: 解析后的表达式
+            names: 表达式中可以直接使用的名称及其值
         """
         # 处理逻辑运算符
         expr = expr.replace(' and ', ' and_ ').replace(' or ', ' or_ ').replace(' not ', ' not_ ')
 
+        code = _compile_condition(expr)
+        if code is None:
+            # 无法编译时，尝试手动解析简单表达式
+            return self._manual_evaluate(expr, names)
+
         try:
-            # 构建安全的求值环境
-            safe_dict = {
-                '__builtins__': {},
-                'True': True,
-                'False': False,
-                'None': None,
-                'and_': lambda a, b: a and b,
-                'or_': lambda a, b: a or b,
-                'not_': lambda a: not a,
-                'len': len,
-            }
-
-            # 简单的表达式求值
-            result = eval(expr, safe_dict)
+            # 在安全的求值环境中执行编译好的表达式
+            env = dict(_SAFE_GLOBALS)
+            env.update(names)
+            result = eval(code, env)
             return bool(result)
         except Exception as e:
             # 如果eval失败，尝试手动解析简单表达式
-            return self._manual_evaluate(expr)
+            return self._manual_evaluate(expr, names)
 
-    def _manual_evaluate(self, expr: str) -> bool:
+    def _manual_evaluate(self, expr: str, names: Dict[str, Any]) -> bool:
         """
         手动解析简单表达式
 
@@ -158,34 +229,39 @@ class ConditionEvaluator:
         """
         expr = expr.strip()
 
-        # 尝试每个运算符
-        for op_str, op_func in self.OPERATORS.items():
-            if op_str in expr:
-                parts = expr.split(op_str, 1)
-                if len(parts) == 2:
-                    left = self._parse_value(parts[0].strip())
-                    right = self._parse_value(parts[1].strip())
-                    try:
-                        return op_func(left, right)
-                    except:
-                        return False
+        # 按最左边的运算符拆分
+        for match in _OPERATOR_RE.finditer(expr):
+            if match.lastgroup is None:
+                continue  # 引号内的字符串
+            op_str = ' '.join(match.group(match.lastgroup).split())
+            left = self._parse_value(expr[:match.start()], names)
+            right = self._parse_value(expr[match.end():], names)
+            try:
+                return self.OPERATORS[op_str](left, right)
+            except:
+                return False
 
         # 单个布尔值
-        if expr.lower() in ['true', '1']:
+        lowered = expr.lower()
+        if lowered in _TRUE_LITERALS:
             return True
-        elif expr.lower() in ['false', '0', 'none', 'null']:
+        elif lowered in _FALSE_LITERALS:
             return False
 
         return False
 
-    def _parse_value(self, value_str: str) -> Any:
+    def _parse_value(self, value_str: str, names: Dict[str, Any]) -> Any:
         """
         解析值字符串为Python类型
         """
         value_str = value_str.strip()
 
+        # 传入的名称（如status_code）
+        if value_str in names:
+            return names[value_str]
+
         # None/null
-        if value_str.lower() in ['none', 'null']:
+        if value_str.lower() in _NULL_LITERALS:
             return None
 
         # 布尔值
@@ -208,54 +284,18 @@ class ConditionEvaluator:
         except ValueError:
             pass
 
-        # 列表
+        # 列表（只解析字面量，不执行表达式）
         if value_str.startswith('[') and value_str.endswith(']'):
             try:
-                return eval(value_str)
-            except:
+                return ast.literal_eval(value_str)
+            except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
                 pass
 
         # 默认返回字符串
         return value_str
 
 
-# 测试代码
+# 测试代码（实现在_selftest中，仅直接运行时加载）
 if __name__ == '__main__':
-    from .context_manager import ContextManager
-
-    # 创建上下文
-    context = ContextManager()
-    context.set('age', 25)
-    context.set('balance', 150)
-    context.set('status', 'active')
-    context.set('roles', ['admin', 'user'])
-
-    # 创建判断器
-    evaluator = ConditionEvaluator(context)
-
-    # 测试用例
-    test_cases = [
-        ('age > 18', True),
-        ('balance >= 100', True),
-        ("status == 'active'", True),
-        ("'admin' in roles", True),
-        ('age > 18 and balance >= 100', True),
-        ('age < 18 or balance < 100', False),
-    ]
-
-    print("条件判断测试:")
-    for expr, expected in test_cases:
-        result = evaluator.evaluate(expr)
-        status = "✓" if result == expected else "✗"
-        print(f"  {status} {expr} => {result} (期望: {expected})")
-
-    # 测试response引用
-    response_data = {
-        'data': {
-            'balance': 200,
-            'status': 'active'
-        }
-    }
-
-    result = evaluator.evaluate('response.data.balance >= 100', response_data)
-    print(f"\n  response.data.balance >= 100 => {result}")
+    from ._selftest import run_condition_evaluator
+    run_condition_evaluator()
@@ -2,13 +2,56 @@
 上下文管理器 - 管理场景执行过程中的变量和数据
 """
 
+import copy
+import functools
 import re
 import time
 import uuid
 import hashlib
-from typing import Any, Dict, Optional
+import random
+import string
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Set, Tuple, Union
 from datetime import datetime
 
+# 字符串中的${...}变量引用
+_VAR_RE = re.compile(r'\$\{([^}]+)\}')
+
+# random_string()使用的字符集
+_ALPHANUMERIC = string.ascii_letters + string.digits
+
+# 函数调用的参数：引号内的字符串（可以包含逗号）或逗号分隔的其他内容
+_ARG_RE = re.compile(r"""\s*('[^']*'|"[^"]*"|[^,]+)""")
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_call(expr: str) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+    """
+    解析函数调用表达式（模板大多是固定的，相同表达式只解析一次）
+
+    Args:
+        expr: 去除首尾空白的表达式，如 random_string(10)
+
+    Returns:
+        (函数名, 参数元组)；不是函数调用时返回None
+    """
+    paren = expr.find('(')
+    if paren == -1 or not expr.endswith(')'):
+        return None
+
+    # 简单的参数解析（支持字符串、数字）
+    args = []
+    for match in _ARG_RE.finditer(expr, paren + 1, len(expr) - 1):
+        arg = match.group(1).strip()
+        if len(arg) >= 2 and arg[0] == arg[-1] and arg[0] in '\'"':
+            args.append(arg[1:-1])  # 字符串
+        elif arg.isdigit():
+            args.append(int(arg))  # 整数
+        else:
+            args.append(arg)  # 其他
+
+    return expr[:paren], tuple(args)
+
 
 class ContextManager:
     """
@@ -78,13 +121,13 @@ class ContextManager:
             return default
 
     def clear_step(self):
-        """清除步骤变量"""
-        self.step_vars = {}
+        """清除步骤变量（原地清空，每个步骤不重新分配字典）"""
+        self.step_vars.clear()
 
     def clear_scenario(self):
         """清除场景变量"""
-        self.scenario_vars = {}
-        self.step_vars = {}
+        self.scenario_vars.clear()
+        self.step_vars.clear()
 
     def resolve(self, template: Any) -> Any:
         """
@@ -95,6 +138,8 @@ class ContextManager:
         - ${func()}: 函数调用
         - 嵌套结构（dict, list）
 
+        不含变量引用的字典/列表原样返回（不复制），调用方需要修改结果时应自行复制
+
         Args:
             template: 模板（字符串、字典、列表等）
 
@@ -104,12 +149,100 @@ class ContextManager:
         if isinstance(template, str):
             return self._resolve_string(template)
         elif isinstance(template, dict):
-            return {k: self.resolve(v) for k, v in template.items()}
+            # 只有某个值确实被替换时才复制字典；
+            # 字面量直接跳过，只有嵌套的字典/列表才递归
+            resolved = None
+            for key, value in template.items():
+                if isinstance(value, str):
+                    if '${' not in value:
+                        continue
+                    new_value = self._resolve_string(value)
+                elif isinstance(value, (dict, list)):
+                    new_value = self.resolve(value)
+                else:
+                    continue
+                if new_value is not value:
+                    if resolved is None:
+                        resolved = dict(template)
+                    resolved[key] = new_value
+            return template if resolved is None else resolved
         elif isinstance(template, list):
-            return [self.resolve(item) for item in template]
+            resolved = None
+            for index, item in enumerate(template):
+                if isinstance(item, str):
+                    if '${' not in item:
+                        continue
+                    new_item = self._resolve_string(item)
+                elif isinstance(item, (dict, list)):
+                    new_item = self.resolve(item)
+                else:
+                    continue
+                if new_item is not item:
+                    if resolved is None:
+                        resolved = list(template)
+                    resolved[index] = new_item
+            return template if resolved is None else resolved
         else:
             return template
 
+    def referenced_variables(self, template: Any) -> Set[str]:
+        """
+        获取模板中引用的变量名（不包括函数调用）
+
+        Args:
+            template: 模板（字符串、字典、列表等）
+
+        Returns:
+            变量名集合
+        """
+        names = set()
+        pending = [template]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, str):
+                if '${' not in item:
+                    continue
+                for match in _VAR_RE.finditer(item):
+                    expr = match.group(1).strip()
+                    if _parse_call(expr) is None:
+                        names.add(expr)
+            elif isinstance(item, dict):
+                pending.extend(item.values())
+            elif isinstance(item, list):
+                pending.extend(item)
+        return names
+
+    def compile_template(self, text: str) -> Tuple[str, ...]:
+        """
+        将字符串模板拆分为字面量和变量引用（用于多次渲染的固定模板，如URL路径）
+
+        Args:
+            text: 字符串模板，如 /api/users/${user_id}
+
+        Returns:
+            字面量与表达式交替的元组（奇数位置为表达式），如 ('/api/users/', 'user_id', '')
+        """
+        return tuple(_VAR_RE.split(text))
+
+    def render_template(self, parts: Tuple[str, ...]) -> str:
+        """
+        渲染compile_template拆分好的模板，变量值总是转为字符串
+
+        Args:
+            parts: compile_template的结果
+
+        Returns:
+            str: 渲染结果
+        """
+        if len(parts) == 1:
+            return parts[0]
+
+        pieces = list(parts)
+        for i in range(1, len(pieces), 2):
+            value = self._evaluate_expression(pieces[i])
+            pieces[i] = str(value) if value is not None else ''
+        return ''.join(pieces)
+
     def _resolve_string(self, text: str) -> Any:
         """
         解析字符串中的变量引用
@@ -119,20 +252,22 @@ class ContextManager:
             "Hello ${username}" -> "Hello test_user"
             "${timestamp()}" -> "1642597200"
         """
+        # 不含变量引用的字符串（大多数字面量）无需正则处理
+        if '${' not in text:
+            return text
+
         # 如果整个字符串都是变量引用，直接返回变量值（保持原类型）
-        if text.startswith('${') and text.endswith('}') and text.count('${') == 1:
-            var_expr = text[2:-1]
-            return self._evaluate_expression(var_expr)
+        whole = _VAR_RE.fullmatch(text)
+        if whole:
+            return self._evaluate_expression(whole.group(1))
 
         # 否则，替换所有变量引用为字符串
-        pattern = r'\$\{([^}]+)\}'
-
         def replacer(match):
             expr = match.group(1)
             value = self._evaluate_expression(expr)
             return str(value) if value is not None else ''
 
-        return re.sub(pattern, replacer, text)
+        return _VAR_RE.sub(replacer, text)
 
     def _evaluate_expression(self, expr: str) -> Any:
         """
@@ -146,22 +281,9 @@ class ContextManager:
         expr = expr.strip()
 
         # 检查是否是函数调用
-        if '(' in expr and expr.endswith(')'):
-            func_name = expr[:expr.index('(')]
-            args_str = expr[expr.index('(') + 1:-1].strip()
-
-            # 解析参数
-            args = []
-            if args_str:
-                # 简单的参数解析（支持字符串、数字）
-                for arg in args_str.split(','):
-                    arg = arg.strip()
-                    if arg.startswith("'") and arg.endswith("'"):
-                        args.append(arg[1:-1])  # 字符串
-                    elif arg.isdigit():
-                        args.append(int(arg))  # 整数
-                    else:
-                        args.append(arg)  # 其他
+        call = _parse_call(expr)
+        if call is not None:
+            func_name, args = call
 
             # 调用函数
             if func_name in self._builtin_functions:
@@ -189,9 +311,7 @@ class ContextManager:
         Args:
             length: 长度
         """
-        import random
-        import string
-        return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+        return ''.join(random.choices(_ALPHANUMERIC, k=length))
 
     def _func_random_int(self, min_val: int = 0, max_val: int = 100) -> int:
         """
@@ -201,7 +321,6 @@ class ContextManager:
             min_val: 最小值
             max_val: 最大值
         """
-        import random
         return random.randint(min_val, max_val)
 
     def _func_date(self, format_str: str = '%Y-%m-%d') -> str:
@@ -213,21 +332,37 @@ class ContextManager:
         """
         return datetime.now().strftime(format_str)
 
-    def _func_md5(self, text: str) -> str:
+    def _func_md5(self, text: Union[str, bytes]) -> str:
         """
-        返回MD5哈希
+        返回MD5哈希（仅用于生成测试数据，不用于安全场景）
 
         Args:
-            text: 输入文本
+            text: 输入文本（也可以是bytes）
+        """
+        data = text if isinstance(text, (bytes, bytearray)) else str(text).encode('utf-8')
+        return hashlib.md5(data, usedforsecurity=False).hexdigest()
+
+    def to_dict(self, deep: bool = False) -> Dict:
         """
-        return hashlib.md5(text.encode()).hexdigest()
+        导出所有变量为字典
+
+        Args:
+            deep: 为True时返回变量的深拷贝（可以修改）；默认返回各作用域的只读视图，
+                  不复制变量，视图随上下文变化
 
-    def to_dict(self) -> Dict:
-        """导出所有变量为字典"""
+        Returns:
+            按作用域（global/scenario/step）组织的变量
+        """
+        if deep:
+            return {
+                'global': copy.deepcopy(self.global_vars),
+                'scenario': copy.deepcopy(self.scenario_vars),
+                'step': copy.deepcopy(self.step_vars)
+            }
         return {
-            'global': self.global_vars.copy(),
-            'scenario': self.scenario_vars.copy(),
-            'step': self.step_vars.copy()
+            'global': MappingProxyType(self.global_vars),
+            'scenario': MappingProxyType(self.scenario_vars),
+            'step': MappingProxyType(self.step_vars)
         }
 
     def __repr__(self) -> str:
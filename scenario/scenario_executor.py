@@ -2,10 +2,16 @@
 场景执行引擎 - 执行业务流程测试场景
 """
 
+import re
 import requests
+import sys
+import threading
 import time
 import json
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, FrozenSet, List, Any, Mapping, Optional, Tuple
 from dataclasses import dataclass, field
 
 from .scenario_parser import ScenarioConfig, StepConfig
@@ -13,6 +19,31 @@ from .context_manager import ContextManager
 from .variable_extractor import VariableExtractor
 from .condition_evaluator import ConditionEvaluator
 
+# 不修改服务端状态的HTTP方法，只有这些步骤可以与相邻步骤并发执行
+_CONCURRENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+# 并行步骤组未配置max_workers时的线程数
+_DEFAULT_PARALLEL_WORKERS = 10
+
+# 场景config中由执行器处理、不作为全局变量的配置项
+_RESERVED_CONFIG_KEYS = frozenset(('base_url', 'timeout', 'retry'))
+
+# 可以直接从字节解析JSON的响应编码
+_UTF8_ENCODINGS = frozenset(('utf-8', 'utf8'))
+
+# 不需要的响应体不超过此大小时仍然读完，以便复用keep-alive连接
+_DRAIN_MAX_BYTES = 64 * 1024
+
+# 可能是JSON的响应内容开头（跳过空白后为JSON值的首字符、BOM或UTF-16/32的零字节）
+_JSON_START_RE = re.compile(rb'\s*(?:[{\["\-0-9tfnNI\x00]|[\x80-\xff])')
+
+# 连接池数量（每个主机一个池），场景访问多个服务时不会互相挤掉连接池
+_POOL_CONNECTIONS = 32
+
+# 只重试建立连接失败的请求（请求尚未发出，修改数据的请求重试也是安全的）；
+# 读取超时和5xx状态码不重试，断言看到的是服务端的真实响应
+_CONNECT_RETRY = Retry(total=2, connect=2, read=False, status=0, redirect=False, backoff_factor=0.1)
+
 
 @dataclass
 class StepResult:
@@ -23,13 +54,28 @@ class StepResult:
     status_code: Optional[int] = None
     response_time: float = 0.0
     request: Dict[str, Any] = field(default_factory=dict)
-    response_data: Any = None
-    response_headers: Dict[str, str] = field(default_factory=dict)
+    response_data: Any = None  # 提取、断言和条件都不使用响应体时不读取，为None
+    response_headers: Mapping[str, str] = field(default_factory=dict)  # 响应头（名称不区分大小写）
     extracted_vars: Dict[str, Any] = field(default_factory=dict)
     errors: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
     skipped: bool = False
     skip_reason: str = ""
+    children: List['StepResult'] = field(default_factory=list)  # 并行步骤组或所选条件分支中各步骤的结果
+    branch: str = ""  # 执行的条件分支（then/else），没有执行分支时为空
+
+
+@dataclass(frozen=True)
+class _StepPlan:
+    """步骤中与上下文无关的信息（每个步骤只分析一次）"""
+    method: Optional[str]  # API定义格式错误时为None
+    path_parts: Tuple[str, ...]  # 拆分好的路径模板（ContextManager.compile_template）
+    concurrent: bool  # 是否可以与相邻的独立步骤并发执行
+    needs_body: bool  # 提取、断言或条件分支是否需要响应体
+    extract_rules: Optional[Tuple[tuple, ...]]  # 编译好的提取规则（配置格式错误时为None）
+    depends_on: FrozenSet[str]  # 显式声明依赖的步骤名称
+    reads: FrozenSet[str]  # 引用的变量
+    writes: FrozenSet[str]  # 提取的变量
 
 
 @dataclass
@@ -47,18 +93,26 @@ class ScenarioResult:
     step_results: List[StepResult] = field(default_factory=list)
     teardown_results: List[StepResult] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
-    context_snapshot: Dict[str, Any] = field(default_factory=dict)
+    context_snapshot: Dict[str, Any] = field(default_factory=dict)  # 作用域 -> 变量的只读视图
 
 
 class ScenarioExecutor:
     """场景测试执行器"""
 
+    # 所有执行器共用的连接池（HTTPAdapter），连续执行多个场景时复用keep-alive连接；
+    # 首次使用时创建，需要更大的连接池时替换
+    _shared_adapter: Optional[HTTPAdapter] = None
+    _shared_pool_maxsize = 0
+    _shared_adapter_lock = threading.Lock()
+
     def __init__(
             self,
             base_url: str = None,
             timeout: int = 30,
             verify_ssl: bool = True,
-            auth_token: str = None
+            auth_token: str = None,
+            max_workers: int = 1,
+            session: Optional[requests.Session] = None
     ):
         """
         初始化场景执行器
@@ -68,18 +122,98 @@ class ScenarioExecutor:
             timeout: 请求超时时间（秒）
             verify_ssl: 是否验证SSL证书
             auth_token: 认证Token（可选）
+            max_workers: 并发执行相互独立的查询步骤时的最大线程数（1表示逐个执行）
+            session: 自定义session（可选），按原样使用；默认创建新的session，
+                     cookie等状态不在执行器之间共享，但共用同一个连接池
         """
         self.default_base_url = base_url
         self.timeout = timeout
         self.verify_ssl = verify_ssl
         self.auth_token = auth_token
-        self.session = requests.Session()
+        self.max_workers = max(1, max_workers)
+        # 所有步骤（包括前置和清理步骤）共用一个session，同一主机的请求复用keep-alive连接，
+        # 不必每个步骤重新建立TCP/TLS连接
+        self._owns_session = session is None  # 自定义session按原样使用，不替换其连接池
+        if session is not None:
+            self.session = session
+        else:
+            self.session = requests.Session()
+            self._mount_shared_adapter(self.max_workers)
+
+        # 步骤分析结果：id(step) -> (step, plan)
+        self._step_plans: Dict[int, Tuple[StepConfig, _StepPlan]] = {}
+
+        # 不含变量的请求体的JSON序列化结果：id(body) -> (body, bytes)
+        self._body_cache: Dict[int, Tuple[Any, bytes]] = {}
 
         # 初始化组件
         self.context = ContextManager()
         self.extractor = VariableExtractor()
         self.evaluator = ConditionEvaluator(self.context)
 
+    @classmethod
+    def _get_shared_adapter(cls, pool_maxsize: int) -> HTTPAdapter:
+        """
+        获取共用的连接池
+
+        每个池的连接数不小于并发线程数（执行场景前按场景中并行步骤组的线程数扩大），
+        并发步骤不会因连接池已满而丢弃keep-alive连接
+
+        Args:
+            pool_maxsize: 每个主机至少需要的连接数
+
+        Returns:
+            HTTPAdapter: 共用的连接池
+        """
+        with cls._shared_adapter_lock:
+            if cls._shared_adapter is None or cls._shared_pool_maxsize < pool_maxsize:
+                cls._shared_adapter = HTTPAdapter(
+                    pool_connections=_POOL_CONNECTIONS,
+                    pool_maxsize=pool_maxsize,
+                    max_retries=_CONNECT_RETRY
+                )
+                cls._shared_pool_maxsize = pool_maxsize
+            return cls._shared_adapter
+
+    def _mount_shared_adapter(self, pool_maxsize: int):
+        """
+        为执行器创建的session挂载共用的连接池
+
+        Args:
+            pool_maxsize: 每个主机至少需要的连接数
+        """
+        adapter = self._get_shared_adapter(pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _max_concurrency(self, steps: List[StepConfig]) -> int:
+        """
+        计算步骤中并行步骤组最多同时发送的请求数
+
+        嵌套的并行步骤组按外层线程数乘以内层线程数计算，条件分支中的步骤同样计入
+
+        Args:
+            steps: 步骤配置列表
+
+        Returns:
+            int: 最多同时发送的请求数（没有并行步骤组时为1）
+        """
+        concurrency = 1
+        for step in steps:
+            if isinstance(step.parallel, dict):
+                children = [child for child in step.parallel.get('steps') or []
+                            if isinstance(child, StepConfig)]
+                max_workers = step.parallel.get('max_workers', _DEFAULT_PARALLEL_WORKERS)
+                if children and isinstance(max_workers, int) and max_workers > 0:
+                    workers = min(max_workers, len(children)) * self._max_concurrency(children)
+                    concurrency = max(concurrency, workers)
+            if isinstance(step.condition, dict):
+                for branch in ('then', 'else'):
+                    children = [child for child in step.condition.get(branch) or []
+                                if isinstance(child, StepConfig)]
+                    concurrency = max(concurrency, self._max_concurrency(children))
+        return concurrency
+
     def execute(self, scenario: ScenarioConfig) -> ScenarioResult:
         """
         执行场景
@@ -92,6 +226,11 @@ class ScenarioExecutor:
         """
         start_time = time.time()
 
+        # 执行器创建的session：连接池按场景中最大的并发数扩大
+        if self._owns_session:
+            steps = scenario.setup + scenario.steps + scenario.teardown
+            self._mount_shared_adapter(max(self.max_workers, self._max_concurrency(steps)))
+
         # 初始化全局配置
         self._init_global_config(scenario.config)
 
@@ -137,7 +276,7 @@ class ScenarioExecutor:
         # 判断场景是否通过
         result.passed = result.failed_steps == 0 and not result.errors
 
-        # 保存上下文快照
+        # 保存上下文快照（各作用域的只读视图，不复制变量）
         result.context_snapshot = self.context.to_dict()
 
         return result
@@ -154,8 +293,9 @@ class ScenarioExecutor:
             self.timeout = config['timeout']
 
         for key, value in config.items():
-            if key not in ['base_url', 'timeout', 'retry']:
-                self.context.set(key, value, 'global')
+            if key in _RESERVED_CONFIG_KEYS:
+                continue
+            self.context.set(key, value, 'global')
 
     def _execute_steps(self, steps: List[StepConfig], phase: str) -> List[StepResult]:
         """
@@ -170,27 +310,207 @@ class ScenarioExecutor:
         """
         results = []
 
-        for i, step in enumerate(steps, 1):
-            print(f"  [{i}/{len(steps)}] {step.name}")
+        if self.max_workers > 1:
+            batches = self._group_independent_steps(steps)
+        else:
+            batches = [[step] for step in steps]
 
+        for batch in batches:
             # 清除步骤变量
             self.context.clear_step()
 
-            # 执行步骤
-            step_result = self._execute_step(step)
-            results.append(step_result)
+            if len(batch) == 1:
+                step = batch[0]
+                print(f"  [{len(results) + 1}/{len(steps)}] {step.name}")
 
-            # 如果步骤失败且不是teardown阶段，可以选择停止
-            if not step_result.passed and not step_result.skipped and phase != "Teardown":
-                print(f"      ❌ 失败: {', '.join(step_result.errors)}")
-                # 继续执行其他步骤（可以根据需要改为停止）
-            elif step_result.skipped:
-                print(f"      ⊘ 跳过: {step_result.skip_reason}")
-            else:
-                print(f"      ✓ 通过 ({step_result.response_time:.2f}s)")
+                # 执行步骤
+                step_result = self._execute_step(step)
+                results.append(step_result)
+                sys.stdout.write(''.join(self._format_step_result(step_result, phase)))
+                continue
+
+            # 相互独立的查询步骤并发执行，结果按步骤顺序一次输出
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batch))) as pool:
+                batch_results = list(pool.map(self._execute_step, batch))
+
+            lines = []
+            for step, step_result in zip(batch, batch_results):
+                lines.append(f"  [{len(results) + 1}/{len(steps)}] {step.name}\n")
+                results.append(step_result)
+                lines.extend(self._format_step_result(step_result, phase))
+            sys.stdout.write(''.join(lines))
 
         return results
 
+    def _group_independent_steps(self, steps: List[StepConfig]) -> List[List[StepConfig]]:
+        """
+        将步骤按顺序分组，同一组内的步骤可以并发执行
+
+        只有相邻的、不修改服务端状态的查询步骤（GET/HEAD/OPTIONS，且没有条件分支）
+        才会分到同一组，并且组内步骤之间没有变量依赖：不引用组内其他步骤提取的变量，
+        也不提取组内其他步骤引用或提取的变量。其他步骤单独成组，保持原有执行顺序。
+
+        修改服务端状态的步骤（如setup中相互独立的创建数据）声明depends_on后也可以分到
+        同一组，但不会与depends_on中列出的步骤分到同一组；没有声明depends_on的查询步骤
+        与这类修改步骤也不会分到同一组，避免读到修改前后不确定的状态。
+
+        Args:
+            steps: 步骤配置列表
+
+        Returns:
+            List[List[StepConfig]]: 步骤分组
+        """
+        batches = []
+        batch: List[StepConfig] = []
+        batch_concurrent = False
+        batch_mutating = False  # 组内是否有修改服务端状态的步骤
+        batch_undeclared = False  # 组内是否有没有声明depends_on的步骤
+        batch_reads: set = set()
+        batch_writes: set = set()
+        batch_names: set = set()
+
+        for step in steps:
+            plan = self._plan_step(step)
+            concurrent, reads, writes = plan.concurrent, plan.reads, plan.writes
+            mutating = plan.method not in _CONCURRENT_METHODS
+            undeclared = step.depends_on is None
+
+            if (batch and concurrent and batch_concurrent
+                    and not (batch_mutating and undeclared)
+                    and not (mutating and batch_undeclared)
+                    and not reads & batch_writes
+                    and not writes & (batch_reads | batch_writes)
+                    and not plan.depends_on & batch_names):
+                batch.append(step)
+                batch_reads |= reads
+                batch_writes |= writes
+                batch_names.add(step.name)
+                batch_mutating = batch_mutating or mutating
+                batch_undeclared = batch_undeclared or undeclared
+            else:
+                if batch:
+                    batches.append(batch)
+                batch = [step]
+                batch_concurrent = concurrent
+                batch_mutating = mutating
+                batch_undeclared = undeclared
+                batch_reads = set(reads)
+                batch_writes = set(writes)
+                batch_names = {step.name}
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def _plan_step(self, step: StepConfig) -> _StepPlan:
+        """
+        分析步骤的API定义和变量依赖（结果按步骤缓存）
+
+        Args:
+            step: 步骤配置
+
+        Returns:
+            _StepPlan: 步骤分析结果
+        """
+        entry = self._step_plans.get(id(step))
+        if entry is not None and entry[0] is step:
+            return entry[1]
+
+        try:
+            method, path = self._parse_api(step.api)
+        except ValueError:
+            method, path = None, None
+
+        plan = _StepPlan(
+            method=method,
+            path_parts=self.context.compile_template(path) if path else ('',),
+            # 查询步骤默认可以并发；其他步骤声明了depends_on（即使为空）才可以并发
+            concurrent=method is not None and not step.condition
+            and (method in _CONCURRENT_METHODS or step.depends_on is not None),
+            depends_on=frozenset(step.depends_on or ()),
+            needs_body=self._needs_response_body(step),
+            extract_rules=self._compile_extract_rules(step),
+            reads=frozenset(self.context.referenced_variables(
+                [step.api, step.request, step.assert_rules]
+            )),
+            writes=frozenset(
+                extract_config['name'] for extract_config in step.extract
+                if isinstance(extract_config, dict) and 'name' in extract_config
+            )
+        )
+        self._step_plans[id(step)] = (step, plan)
+        return plan
+
+    def _compile_extract_rules(self, step: StepConfig) -> Optional[Tuple[tuple, ...]]:
+        """
+        编译步骤的提取规则
+
+        Args:
+            step: 步骤配置
+
+        Returns:
+            编译好的提取规则；配置格式错误时返回None（执行时按原始配置提取并报告错误）
+        """
+        try:
+            return self.extractor.compile_rules(step.extract)
+        except Exception:
+            return None
+
+    def _needs_response_body(self, step: StepConfig) -> bool:
+        """
+        判断步骤是否需要读取响应体
+
+        只检查状态码、提取响应头/Cookie的步骤（如清理阶段的DELETE）不需要响应体
+
+        Args:
+            step: 步骤配置
+
+        Returns:
+            bool: 是否需要响应体
+        """
+        if step.condition:
+            return True
+        if any(not isinstance(rule, str) or 'response' in rule for rule in step.assert_rules):
+            return True
+        return any(
+            not isinstance(extract_config, dict) or 'path' in extract_config or 'regex' in extract_config
+            for extract_config in step.extract
+        )
+
+    def _format_step_result(self, step_result: StepResult, phase: str) -> List[str]:
+        """
+        生成单个步骤的提取变量和执行结果的输出行（由调用方一次写出）
+
+        Args:
+            step_result: 步骤结果
+            phase: 阶段名称（Setup/Main/Teardown）
+
+        Returns:
+            List[str]: 输出行（包含换行符）
+        """
+        lines = [
+            f"      📌 提取变量: {name} = {value}\n"
+            for name, value in step_result.extracted_vars.items()
+        ]
+
+        # 如果步骤失败且不是teardown阶段，可以选择停止
+        if not step_result.passed and not step_result.skipped and phase != "Teardown":
+            lines.append(f"      ❌ 失败: {', '.join(step_result.errors)}\n")
+            # 继续执行其他步骤（可以根据需要改为停止）
+        elif step_result.skipped:
+            lines.append(f"      ⊘ 跳过: {step_result.skip_reason}\n")
+        else:
+            lines.append(f"      ✓ 通过 ({step_result.response_time:.2f}s)\n")
+
+        if step_result.branch:
+            lines.append(f"      → 条件分支: {step_result.branch}\n")
+        for child in step_result.children:
+            status = '✓' if child.passed else ('⊘' if child.skipped else '❌')
+            lines.append(f"      {status} {child.name} ({child.response_time:.2f}s)\n")
+
+        return lines
+
     def _execute_step(self, step: StepConfig) -> StepResult:
         """
         执行单个步骤
@@ -201,6 +521,11 @@ class ScenarioExecutor:
         Returns:
             StepResult: 步骤执行结果
         """
+        if step.parallel:
+            return self._execute_parallel_step(step)
+        if step.condition and not step.api:
+            return self._execute_condition_step(step)
+
         result = StepResult(
             name=step.name,
             api=step.api,
@@ -208,14 +533,18 @@ class ScenarioExecutor:
         )
 
         try:
-            # 1. 解析API定义（METHOD /path）
-            method, path = self._parse_api(step.api)
+            # 1. 解析API定义（METHOD /path，每个步骤只解析一次）
+            plan = self._plan_step(step)
+            if plan.method is None:
+                self._parse_api(step.api)  # 抛出格式错误
+            method = plan.method
 
             # 2. 构建请求
-            url = self._build_url(path)
+            url = self._build_url(plan.path_parts)
             headers = self._build_headers(step.request.get('headers', {}))
             params = self._build_params(step.request.get('query', {}))
-            body = self._build_body(step.request.get('body'))
+            body_template = step.request.get('body')
+            body = self._build_body(body_template)
 
             # 3. 记录请求信息
             result.request = {
@@ -228,32 +557,42 @@ class ScenarioExecutor:
 
             # 4. 执行HTTP请求
             start_time = time.time()
-            response = self._make_request(method, url, headers, params, body)
+            response = self._make_request(
+                method, url, headers, params, body,
+                stream=not plan.needs_body,
+                body_template=body_template
+            )
             result.response_time = time.time() - start_time
 
             # 5. 记录响应信息
             result.status_code = response.status_code
-            result.response_headers = dict(response.headers)
+            result.response_headers = response.headers  # CaseInsensitiveDict，不复制
 
-            # 解析响应数据
-            try:
-                result.response_data = response.json()
-            except:
-                result.response_data = response.text
+            # 解析响应数据（不需要响应体时不读取）
+            if plan.needs_body:
+                result.response_data = self._decode_response(response)
+            else:
+                self._discard_body(response)
 
             # 6. 提取变量
             if step.extract:
-                extracted = self.extractor.extract(
-                    result.response_data,
-                    step.extract,
-                    result.response_headers
-                )
+                if plan.extract_rules is None:
+                    extracted = self.extractor.extract(
+                        result.response_data,
+                        step.extract,
+                        result.response_headers
+                    )
+                else:
+                    extracted = self.extractor.extract_rules(
+                        result.response_data,
+                        plan.extract_rules,
+                        result.response_headers
+                    )
                 result.extracted_vars = extracted
 
                 # 将提取的变量保存到上下文
                 for name, value in extracted.items():
                     self.context.set(name, value, 'scenario')
-                    print(f"      📌 提取变量: {name} = {value}")
 
             # 7. 执行断言
             if step.assert_rules:
@@ -288,6 +627,54 @@ class ScenarioExecutor:
 
         return result
 
+    def _execute_parallel_step(self, step: StepConfig) -> StepResult:
+        """
+        并发执行并行步骤组中的子步骤
+
+        子步骤共用session和上下文，提取的变量在所有子步骤完成后对后续步骤可见，
+        子步骤之间不应相互引用提取的变量
+
+        Args:
+            step: 包含parallel配置的步骤
+
+        Returns:
+            StepResult: 步骤组的结果（任一子步骤失败则失败）
+        """
+        result = StepResult(name=step.name, api=step.api, passed=False)
+        children = step.parallel.get('steps', [])
+        if not children:
+            result.errors.append("并行步骤组没有子步骤")
+            return result
+
+        max_workers = step.parallel.get('max_workers', _DEFAULT_PARALLEL_WORKERS)
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(children))) as pool:
+            result.children = list(pool.map(self._execute_step, children))
+        result.response_time = time.time() - start_time
+
+        for child in result.children:
+            result.extracted_vars.update(child.extracted_vars)
+            result.errors.extend(f"{child.name}: {error}" for error in child.errors)
+        result.passed = all(child.passed or child.skipped for child in result.children)
+
+        return result
+
+    def _execute_condition_step(self, step: StepConfig) -> StepResult:
+        """
+        执行只做条件判断的步骤（不发送请求，根据已有变量选择分支）
+
+        Args:
+            step: 包含condition配置、没有api的步骤
+
+        Returns:
+            StepResult: 步骤结果（所选分支中任一步骤失败则失败）
+        """
+        result = StepResult(name=step.name, api=step.api, passed=True)
+        start_time = time.time()
+        self._handle_condition(step.condition, result)
+        result.response_time = time.time() - start_time
+        return result
+
     def _parse_api(self, api: str) -> tuple:
         """
         解析API定义
@@ -307,18 +694,18 @@ class ScenarioExecutor:
 
         return method, path
 
-    def _build_url(self, path: str) -> str:
+    def _build_url(self, path_parts: Tuple[str, ...]) -> str:
         """
         构建完整URL
 
         Args:
-            path: 路径（可能包含变量）
+            path_parts: 拆分好的路径模板（可能包含变量）
 
         Returns:
             str: 完整URL
         """
         # 解析路径中的变量
-        resolved_path = self.context.resolve(path)
+        resolved_path = self.context.render_template(path_parts)
 
         # 获取base_url
         base_url = self.context.get('base_url', self.default_base_url)
@@ -337,8 +724,8 @@ class ScenarioExecutor:
         if not headers:
             headers = {}
 
-        # 解析变量
-        resolved = self.context.resolve(headers)
+        # 解析变量（复制一份，添加认证头时不修改步骤配置）
+        resolved = dict(self.context.resolve(headers))
 
         # 添加认证头
         if self.auth_token and 'Authorization' not in resolved:
@@ -366,7 +753,9 @@ class ScenarioExecutor:
             url: str,
             headers: Dict,
             params: Dict,
-            body: Any
+            body: Any,
+            stream: bool = False,
+            body_template: Any = None
     ) -> requests.Response:
         """
         执行HTTP请求
@@ -377,6 +766,8 @@ class ScenarioExecutor:
             headers: 请求头
             params: 查询参数
             body: 请求体
+            stream: 为True时只读取状态行和响应头，响应体由调用方读取或丢弃
+            body_template: 步骤配置中的请求体模板（没有变量被替换时与body是同一对象）
 
         Returns:
             requests.Response: 响应对象
@@ -386,6 +777,9 @@ class ScenarioExecutor:
             'verify': self.verify_ssl
         }
 
+        if stream:
+            kwargs['stream'] = True
+
         if headers:
             kwargs['headers'] = headers
 
@@ -394,13 +788,92 @@ class ScenarioExecutor:
 
         if body is not None:
             if isinstance(body, dict):
-                kwargs['json'] = body
+                # 与requests的json参数相同：序列化为UTF-8 JSON，未指定时添加Content-Type
+                kwargs['data'] = self._encode_json_body(body, body_template)
+                if not any(key.lower() == 'content-type' for key in headers):
+                    kwargs['headers'] = {**headers, 'Content-Type': 'application/json'}
             else:
                 kwargs['data'] = body
 
         response = self.session.request(method, url, **kwargs)
         return response
 
+    def _encode_json_body(self, body: Dict, body_template: Any) -> bytes:
+        """
+        将请求体序列化为JSON字节
+
+        不含变量的请求体模板每次解析都是同一个对象，序列化结果按模板缓存，
+        同一步骤重复执行时不再重新序列化
+
+        Args:
+            body: 解析变量后的请求体
+            body_template: 步骤配置中的请求体模板
+
+        Returns:
+            bytes: JSON字节
+        """
+        cacheable = body is body_template
+        if cacheable:
+            entry = self._body_cache.get(id(body))
+            if entry is not None and entry[0] is body:
+                return entry[1]
+
+        data = json.dumps(body, allow_nan=False).encode('utf-8')
+        if cacheable:
+            self._body_cache[id(body)] = (body, data)
+        return data
+
+    def _decode_response(self, response: requests.Response) -> Any:
+        """
+        解析响应体：能解析为JSON时返回解析结果，否则返回文本
+
+        UTF-8（或未声明编码）的响应直接从字节解析，不经过requests的文本解码；
+        Content-Type不是JSON且内容开头不可能是JSON时（如HTML、纯文本）直接返回文本，
+        不必先尝试解析再处理异常
+
+        Args:
+            response: 响应对象
+
+        Returns:
+            解析后的JSON数据或响应文本
+        """
+        content = response.content
+        if not content:
+            return ''
+
+        # 先判断是否可能是JSON，再决定按字节还是按声明的编码解码
+        # （text/*响应默认编码为ISO-8859-1，不能据此判断是否是JSON）
+        if 'json' not in response.headers.get('Content-Type', '') and not _JSON_START_RE.match(content):
+            return response.text
+
+        encoding = response.encoding
+        try:
+            if encoding is not None and encoding.lower() not in _UTF8_ENCODINGS:
+                return json.loads(response.text)
+            return json.loads(content)
+        except ValueError:
+            return response.text
+
+    def _discard_body(self, response: requests.Response):
+        """
+        丢弃不需要的响应体
+
+        较小的响应体直接读完，连接可以放回连接池复用；较大或长度未知的响应体
+        不下载，直接关闭连接
+
+        Args:
+            response: 以stream方式获取的响应对象
+        """
+        try:
+            length = int(response.headers.get('Content-Length', ''))
+        except ValueError:
+            length = None
+
+        if length is not None and length <= _DRAIN_MAX_BYTES:
+            response.content
+        else:
+            response.close()
+
     def _run_assertions(
             self,
             assert_rules: List[str],
@@ -419,14 +892,13 @@ class ScenarioExecutor:
             List[str]: 错误列表（空表示全部通过）
         """
         errors = []
+        # status_code作为名称传给求值器，不替换到规则文本中
+        names = {'status_code': status_code}
 
         for rule in assert_rules:
             try:
-                # 替换 status_code 和 response 引用
-                rule_with_context = rule.replace('status_code', str(status_code))
-
-                # 求值断言表达式
-                passed = self.evaluator.evaluate(rule_with_context, response_data)
+                # 求值断言表达式（response引用由求值器解析）
+                passed = self.evaluator.evaluate(rule, response_data, names)
 
                 if not passed:
                     errors.append(f"断言失败: {rule}")
@@ -438,7 +910,10 @@ class ScenarioExecutor:
 
     def _handle_condition(self, condition: Dict, step_result: StepResult):
         """
-        处理条件分支
+        处理条件分支：求值条件并依次执行所选分支中的步骤
+
+        分支步骤的结果记录在step_result.children中，提取的变量合并到当前步骤，
+        任一分支步骤失败则当前步骤失败
 
         Args:
             condition: 条件配置
@@ -450,21 +925,37 @@ class ScenarioExecutor:
             if not condition_expr:
                 return
 
-            passed = self.evaluator.evaluate(condition_expr, step_result.response_data)
+            passed = self.evaluator.evaluate(
+                condition_expr,
+                step_result.response_data,
+                {'status_code': step_result.status_code}
+            )
 
             # 根据条件选择分支
             if passed:
-                next_steps = condition.get('then', [])
+                next_steps = condition.get('then') or []
             else:
-                next_steps = condition.get('else', [])
-
-            # 执行后续步骤
-            if next_steps:
-                # 这里简化处理，实际可能需要更复杂的逻辑
-                print(f"      → 条件分支: {'then' if passed else 'else'}")
+                next_steps = condition.get('else') or []
 
         except Exception as e:
             step_result.warnings.append(f"条件分支处理失败: {str(e)}")
+            return
+
+        if not next_steps:
+            return
+
+        # 执行所选分支的步骤（解析器已将分支中的步骤解析为StepConfig）
+        step_result.branch = 'then' if passed else 'else'
+        for next_step in next_steps:
+            if not isinstance(next_step, StepConfig):
+                step_result.warnings.append(f"条件分支中的步骤格式错误: {next_step}")
+                continue
+            child = self._execute_step(next_step)
+            step_result.children.append(child)
+            step_result.extracted_vars.update(child.extracted_vars)
+            step_result.errors.extend(f"{child.name}: {error}" for error in child.errors)
+            if not child.passed and not child.skipped:
+                step_result.passed = False
 
     def _update_stats(self, scenario_result: ScenarioResult, step_results: List[StepResult]):
         """更新统计信息"""
@@ -477,25 +968,7 @@ class ScenarioExecutor:
                 scenario_result.failed_steps += 1
 
 
-# 测试代码
+# 测试代码（实现在_selftest中，仅直接运行时加载）
 if __name__ == '__main__':
-    from .scenario_parser import ScenarioParser
-
-    # 解析场景
-    parser = ScenarioParser()
-    scenario = parser.parse_file('scenarios/user_workflow_example.yaml')
-
-    # 执行场景
-    executor = ScenarioExecutor()
-    result = executor.execute(scenario)
-
-    # 输出结果
-    print(f"\n{'=' * 60}")
-    print(f"场景: {result.name}")
-    print(f"状态: {'✓ 通过' if result.passed else '✗ 失败'}")
-    print(f"步骤: {result.total_steps} 个")
-    print(f"  - 通过: {result.passed_steps}")
-    print(f"  - 失败: {result.failed_steps}")
-    print(f"  - 跳过: {result.skipped_steps}")
-    print(f"耗时: {result.total_time:.2f}秒")
-    print(f"{'=' * 60}")
+    from ._selftest import run_scenario_executor
+    run_scenario_executor()
@@ -6,6 +6,11 @@ import yaml
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, field
 
+from core.yaml_cache import YamlLoader, load_yaml_file
+
+# 步骤API定义中支持的HTTP方法
+_VALID_METHODS = frozenset(('GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS'))
+
 
 @dataclass
 class StepConfig:
@@ -18,6 +23,7 @@ class StepConfig:
     condition: Optional[Dict[str, Any]] = None  # 条件分支
     loop: Optional[Dict[str, Any]] = None  # 循环配置
     parallel: Optional[Dict[str, Any]] = None  # 并行配置
+    depends_on: Optional[List[str]] = None  # 显式声明依赖的步骤名称（声明后可与其他步骤并发执行）
 
 
 @dataclass
@@ -50,8 +56,8 @@ class ScenarioParser:
             FileNotFoundError: 文件不存在
         """
         try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            # 解析结果缓存在同目录的JSON旁路文件中，文件未修改时不再重新解析YAML
+            data = load_yaml_file(yaml_file)
         except FileNotFoundError:
             raise FileNotFoundError(f"场景文件不存在: {yaml_file}")
         except yaml.YAMLError as e:
@@ -59,6 +65,57 @@ class ScenarioParser:
 
         return self.parse(data)
 
+    def read_header(self, yaml_file: str) -> Dict[str, str]:
+        """
+        只读取场景文件的头部信息，不解析整个文件
+
+        按YAML解析事件读取scenario节点下第一个嵌套块（config、steps等）之前的
+        标量字段（如name、version、description），读到嵌套块即停止
+
+        Args:
+            yaml_file: YAML文件路径
+
+        Returns:
+            Dict[str, str]: 头部字段（值为YAML中的原始字符串）
+
+        Raises:
+            ValueError: 文件格式错误
+            FileNotFoundError: 文件不存在
+        """
+        header = {}
+        try:
+            with open(yaml_file, 'r', encoding='utf-8') as f:
+                events = yaml.parse(f, Loader=YamlLoader)
+                depth = 0  # 当前所在的映射/序列层数
+                in_scenario = False
+                key = None
+                for event in events:
+                    if isinstance(event, yaml.ScalarEvent):
+                        if depth == 1 and not in_scenario:
+                            # 根节点的键：只关心scenario
+                            if event.value != 'scenario':
+                                break
+                            in_scenario = True
+                        elif depth == 2 and in_scenario:
+                            if key is None:
+                                key = event.value
+                            else:
+                                header[key] = event.value
+                                key = None
+                    elif isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                        # scenario节点的值之外出现嵌套块，头部结束
+                        if depth >= 2 or (depth == 1 and not in_scenario):
+                            break
+                        depth += 1
+                    elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                        break
+        except FileNotFoundError:
+            raise FileNotFoundError(f"场景文件不存在: {yaml_file}")
+        except yaml.YAMLError as e:
+            raise ValueError(f"YAML格式错误: {e}")
+
+        return header
+
     def parse(self, data: Dict) -> ScenarioConfig:
         """
         解析场景定义数据
@@ -148,27 +205,43 @@ class ScenarioParser:
         if not name:
             raise ValueError("步骤缺少名称 'name'")
 
+        # 并行步骤组和只做条件判断的步骤本身不发送请求，可以没有api
+        parallel = step_data.get('parallel')
+        condition = step_data.get('condition')
         api = step_data.get('api')
-        if not api:
+        if not api and not parallel and not condition:
             raise ValueError(f"步骤 '{name}' 缺少 'api' 定义")
 
         # 可选字段
         request = step_data.get('request', {})
         extract = step_data.get('extract', [])
         assert_rules = step_data.get('assert', [])
-        condition = step_data.get('condition')
         loop = step_data.get('loop')
-        parallel = step_data.get('parallel')
+        depends_on = step_data.get('depends_on')
+
+        # 并行组中的子步骤按普通步骤解析（复制配置，不修改原始数据）
+        if isinstance(parallel, dict) and isinstance(parallel.get('steps'), list):
+            parallel = dict(parallel)
+            parallel['steps'] = self._parse_steps(parallel['steps'])
+
+        # 条件分支中的步骤同样按普通步骤解析
+        if isinstance(condition, dict):
+            branches = [branch for branch in ('then', 'else') if isinstance(condition.get(branch), list)]
+            if branches:
+                condition = dict(condition)
+                for branch in branches:
+                    condition[branch] = self._parse_steps(condition[branch])
 
         return StepConfig(
             name=name,
-            api=api,
+            api=api or '',
             request=request,
             extract=extract,
             assert_rules=assert_rules,
             condition=condition,
             loop=loop,
-            parallel=parallel
+            parallel=parallel,
+            depends_on=depends_on
         )
 
     def validate(self, scenario: ScenarioConfig) -> List[str]:
@@ -216,9 +289,14 @@ class ScenarioParser:
         if not step.name or not step.name.strip():
             errors.append(f"第 {index} 个步骤缺少名称")
 
-        # 验证API定义
+        # 验证并行配置
+        if step.parallel is not None:
+            errors.extend(self._validate_parallel(step))
+
+        # 验证API定义（并行步骤组和条件判断步骤可以没有API定义）
         if not step.api or not step.api.strip():
-            errors.append(f"步骤 '{step.name}' 缺少API定义")
+            if step.parallel is None and not step.condition:
+                errors.append(f"步骤 '{step.name}' 缺少API定义")
         else:
             # 验证API格式（应该是 "METHOD /path" 格式）
             parts = step.api.strip().split(None, 1)
@@ -226,8 +304,7 @@ class ScenarioParser:
                 errors.append(f"步骤 '{step.name}' 的API格式错误，应为 'METHOD /path'")
             else:
                 method, path = parts
-                valid_methods = ['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS']
-                if method.upper() not in valid_methods:
+                if method.upper() not in _VALID_METHODS:
                     errors.append(f"步骤 '{step.name}' 的HTTP方法 '{method}' 不支持")
 
         # 验证extract配置
@@ -238,36 +315,59 @@ class ScenarioParser:
                 elif 'name' not in extract_config:
                     errors.append(f"步骤 '{step.name}' 的extract配置缺少 'name' 字段")
 
+        # 验证depends_on配置
+        if step.depends_on is not None:
+            if not isinstance(step.depends_on, list) or \
+                    not all(isinstance(name, str) for name in step.depends_on):
+                errors.append(f"步骤 '{step.name}' 的depends_on必须是步骤名称列表")
+
         # 验证condition配置
         if step.condition:
             if not isinstance(step.condition, dict):
                 errors.append(f"步骤 '{step.name}' 的condition配置必须是字典")
             elif 'if' not in step.condition:
                 errors.append(f"步骤 '{step.name}' 的condition配置缺少 'if' 条件")
+            else:
+                for branch in ('then', 'else'):
+                    for i, child in enumerate(step.condition.get(branch) or []):
+                        if isinstance(child, StepConfig):
+                            errors.extend(self._validate_step(child, i + 1))
 
         return errors
 
+    def _validate_parallel(self, step: StepConfig) -> List[str]:
+        """
+        验证并行配置及其子步骤
+
+        Args:
+            step: 包含parallel配置的步骤
 
-# 测试代码
-if __name__ == '__main__':
-    parser = ScenarioParser()
-
-    # 测试解析示例场景文件
-    try:
-        scenario = parser.parse_file('scenarios/user_workflow_example.yaml')
-        print(f"✓ 成功解析场景: {scenario.name}")
-        print(f"  描述: {scenario.description}")
-        print(f"  步骤数: {len(scenario.steps)}")
-        print(f"  清理步骤: {len(scenario.teardown)}")
-
-        # 验证场景
-        errors = parser.validate(scenario)
-        if errors:
-            print("\n验证错误:")
-            for error in errors:
-                print(f"  - {error}")
+        Returns:
+            List[str]: 错误列表
+        """
+        parallel = step.parallel
+        if not isinstance(parallel, dict):
+            return [f"步骤 '{step.name}' 的parallel配置必须是字典"]
+
+        errors = []
+        if 'items' in parallel:
+            errors.append(f"步骤 '{step.name}' 的parallel配置暂不支持 'items' 循环")
+
+        children = parallel.get('steps')
+        if not children or not isinstance(children, list):
+            errors.append(f"步骤 '{step.name}' 的parallel配置缺少 'steps' 子步骤")
         else:
-            print("\n✓ 场景验证通过")
+            for i, child in enumerate(children):
+                errors.extend(self._validate_step(child, i + 1))
 
-    except Exception as e:
-        print(f"✗ 解析失败: {e}")
+        max_workers = parallel.get('max_workers', 1)
+        if not isinstance(max_workers, int) or max_workers < 1:
+            errors.append(f"步骤 '{step.name}' 的parallel.max_workers必须是正整数")
+
+        return errors
+
+
+# 测试代码（实现在_selftest中，仅直接运行时加载）
+if __name__ == '__main__':
+    from ._selftest import run_scenario_parser
+    run_scenario_parser()
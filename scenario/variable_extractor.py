@@ -2,9 +2,143 @@
 变量提取器 - 从API响应中提取数据
 """
 
+import functools
 import re
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from requests.structures import CaseInsensitiveDict
+
+# JSONPath访问步骤的类型
+_KEY = 0  # 字典键：data
+_INDEX = 1  # 数组下标：items[0]
+_WILDCARD = 2  # 数组通配符：items[*]
+_BAD_INDEX = 3  # 无法解析的下标，访问结果为None
+
+# 提取规则的类型（VariableExtractor.compile_rules的结果）
+_RULE_PATH = 0
+_RULE_HEADER = 1
+_RULE_COOKIE = 2
+_RULE_REGEX = 3
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_jsonpath(path: str) -> Tuple[Tuple[int, str, int], ...]:
+    """
+    将JSONPath表达式编译为访问步骤（相同路径只解析一次）
+
+    每个路径段中只识别第一个[...]下标，与逐段解析的规则一致
+
+    Args:
+        path: 已去除开头$的路径，如 data.items[0].name
+
+    Returns:
+        (步骤类型, 键, 下标)元组
+    """
+    segments = path.split('.')
+    # 末尾的单个点号不产生访问步骤（如 "data."）
+    if len(segments) > 1 and not segments[-1]:
+        segments.pop()
+
+    program = []
+    for segment in segments:
+        if '[' not in segment:
+            program.append((_KEY, segment, 0))
+            continue
+
+        key = segment[:segment.index('[')]
+        index_part = segment[segment.index('[') + 1:segment.index(']')]
+        if index_part == '*':
+            program.append((_WILDCARD, key, 0))  # 下标位置在下面标记剩余步骤是否都是字典键
+        else:
+            try:
+                program.append((_INDEX, key, int(index_part)))
+            except ValueError:
+                program.append((_BAD_INDEX, key, 0))
+
+    # 通配符之后只有字典键访问时（如 items[*].user.id），遍历时逐个元素直接取键，不递归
+    for pos, (op, key, _) in enumerate(program):
+        if op == _WILDCARD and all(step[0] == _KEY for step in program[pos + 1:]):
+            program[pos] = (_WILDCARD, key, 1)
+
+    return tuple(program)
+
+
+def _traverse_path(data: Any, program: Tuple[Tuple[int, str, int], ...], start: int) -> Any:
+    """
+    按编译好的访问步骤遍历数据（模块级函数，热路径上没有方法查找）
+
+    Args:
+        data: 当前数据
+        program: _compile_jsonpath的结果
+        start: 从第几个访问步骤开始
+
+    Returns:
+        访问到的值，路径不存在时返回None
+    """
+    end = len(program)
+    for pos in range(start, end):
+        op, key, index = program[pos]
+
+        # 普通键访问
+        if op == _KEY:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+            continue
+
+        # 获取数组（当前数据本身是列表时直接使用）
+        arr = data.get(key) if isinstance(data, dict) else data
+        if not isinstance(arr, list):
+            return None
+
+        if op == _WILDCARD:
+            # 对每个元素继续遍历剩余路径
+            if pos + 1 == end:
+                return arr
+            # 最常见的 items[*].id：直接取每个元素的键
+            if pos + 2 == end and program[pos + 1][0] == _KEY:
+                key = program[pos + 1][1]
+                return [item.get(key) if isinstance(item, dict) else None for item in arr]
+            # 剩余步骤都是字典键：逐个元素按键取值，不逐个递归
+            if index:
+                keys = [step[1] for step in program[pos + 1:]]
+                values = []
+                for item in arr:
+                    for key in keys:
+                        if not isinstance(item, dict):
+                            item = None
+                            break
+                        item = item.get(key)
+                    values.append(item)
+                return values
+            return [_traverse_path(item, program, pos + 1) for item in arr]
+
+        if op == _BAD_INDEX:
+            return None
+
+        try:
+            data = arr[index]
+        except IndexError:
+            return None
+
+    return data
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_regex(pattern: str) -> re.Pattern:
+    """编译提取规则中的正则表达式（相同表达式只编译一次）"""
+    return re.compile(pattern)
+
+
+@functools.lru_cache(maxsize=256)
+def _cookie_pattern(name: str) -> re.Pattern:
+    """
+    Set-Cookie头中指定cookie的正则表达式（相同名称只编译一次）
+
+    cookie名称按字面匹配，且必须是完整的名称（session_id不会匹配到id）
+    """
+    return re.compile(rf'(?<![^\s;,]){re.escape(name)}=([^;]+)')
 
 
 class VariableExtractor:
@@ -34,36 +168,84 @@ class VariableExtractor:
                 {"name": "order_id", "regex": r"order_(\\d+)", "group": 1}
             ]
         """
-        extracted = {}
+        return self.extract_rules(response, self.compile_rules(extract_config), headers)
+
+    def compile_rules(self, extract_config: List[Dict]) -> Tuple[tuple, ...]:
+        """
+        预先确定每条提取配置的类型并编译正则表达式（同一步骤的配置只需编译一次）
+
+        Args:
+            extract_config: 提取配置列表
 
+        Returns:
+            (类型, 变量名, 参数, 正则表达式, 捕获组)元组；header/cookie规则在没有响应头时
+            退回正则提取（与配置中的regex字段对应），正则表达式为原始字符串，用到时才编译
+        """
+        rules = []
         for config in extract_config:
             name = config.get('name')
             if not name:
                 continue
 
-            value = None
+            pattern = config.get('regex')
+            group = config.get('group', 0)
+            if 'path' in config:
+                rules.append((_RULE_PATH, name, config['path'], None, 0))
+            elif 'header' in config:
+                rules.append((_RULE_HEADER, name, config['header'], pattern, group))
+            elif 'cookie' in config:
+                rules.append((_RULE_COOKIE, name, config['cookie'], pattern, group))
+            elif 'regex' in config:
+                rules.append((_RULE_REGEX, name, None, _compile_regex(pattern), group))
 
+        return tuple(rules)
+
+    def extract_rules(
+            self,
+            response: Any,
+            rules: Tuple[tuple, ...],
+            headers: Dict = None
+    ) -> Dict[str, Any]:
+        """
+        按compile_rules编译好的规则提取变量
+
+        Args:
+            response: 响应数据（通常是dict）
+            rules: compile_rules的结果
+            headers: 响应头
+
+        Returns:
+            提取的变量字典 {name: value}
+        """
+        extracted = {}
+        # 正则提取使用的响应文本，第一次用到时才序列化，多个正则规则共用
+        text = None
+
+        for kind, name, arg, pattern, group in rules:
             # JSONPath提取
-            if 'path' in config:
-                value = self.extract_jsonpath(response, config['path'])
+            if kind == _RULE_PATH:
+                value = self.extract_jsonpath(response, arg)
 
             # Header提取
-            elif 'header' in config and headers:
-                value = self.extract_header(headers, config['header'])
+            elif kind == _RULE_HEADER and headers:
+                value = self.extract_header(headers, arg)
 
             # Cookie提取
-            elif 'cookie' in config and headers:
-                value = self.extract_cookie(headers, config['cookie'])
+            elif kind == _RULE_COOKIE and headers:
+                value = self.extract_cookie(headers, arg)
 
             # 正则提取
-            elif 'regex' in config:
-                # 将响应转为字符串
-                text = json.dumps(response) if isinstance(response, (dict, list)) else str(response)
-                value = self.extract_regex(
-                    text,
-                    config['regex'],
-                    config.get('group', 0)
-                )
+            elif pattern is not None:
+                # 将响应转为字符串（保持json.dumps的默认格式，已有的正则规则依赖它）
+                if text is None:
+                    text = json.dumps(response) if isinstance(response, (dict, list)) else str(response)
+                if isinstance(pattern, str):
+                    pattern = _compile_regex(pattern)
+                match = pattern.search(text)
+                value = match.group(group) if match else None
+
+            else:
+                value = None
 
             if value is not None:
                 extracted[name] = value
@@ -98,59 +280,11 @@ class VariableExtractor:
         if not path:
             return data
 
-        try:
-            return self._traverse_path(data, path)
-        except (KeyError, IndexError, TypeError):
-            return None
-
-    def _traverse_path(self, data: Any, path: str) -> Any:
-        """递归遍历路径"""
-        if not path:
-            return data
-
-        # 分离第一个路径段
-        if '.' in path:
-            first, rest = path.split('.', 1)
-        else:
-            first, rest = path, ''
-
-        # 处理数组索引 items[0] 或 items[*]
-        if '[' in first:
-            key = first[:first.index('[')]
-            index_part = first[first.index('[') + 1:first.index(']')]
-
-            # 获取数组
-            if isinstance(data, dict):
-                arr = data.get(key)
-            else:
-                arr = data
-
-            if not isinstance(arr, list):
-                return None
+        # 单个键（如 $.token）直接取值，不必查找编译结果
+        if '.' not in path and '[' not in path:
+            return data.get(path) if isinstance(data, dict) else None
 
-            # 处理通配符 [*]
-            if index_part == '*':
-                if not rest:
-                    return arr
-                else:
-                    # 对每个元素继续遍历
-                    return [self._traverse_path(item, rest) for item in arr]
-            else:
-                # 特定索引
-                try:
-                    index = int(index_part)
-                    item = arr[index]
-                    return self._traverse_path(item, rest) if rest else item
-                except (ValueError, IndexError):
-                    return None
-
-        # 普通键访问
-        else:
-            if isinstance(data, dict):
-                value = data.get(first)
-                return self._traverse_path(value, rest) if rest else value
-            else:
-                return None
+        return _traverse_path(data, _compile_jsonpath(path), 0)
 
     def extract_regex(self, text: str, pattern: str, group: int = 0) -> Optional[str]:
         """
@@ -164,7 +298,7 @@ class VariableExtractor:
         Returns:
             匹配的文本
         """
-        match = re.search(pattern, text)
+        match = _compile_regex(pattern).search(text)
         if match:
             return match.group(group)
         return None
@@ -180,9 +314,14 @@ class VariableExtractor:
         Returns:
             头值
         """
-        # HTTP头名称不区分大小写
+        # requests的响应头本身不区分大小写，直接查找
+        if isinstance(headers, CaseInsensitiveDict):
+            return headers.get(name)
+
+        # 普通字典：HTTP头名称不区分大小写
+        lower_name = name.lower()
         for key, value in headers.items():
-            if key.lower() == name.lower():
+            if key.lower() == lower_name:
                 return value
         return None
 
@@ -203,53 +342,13 @@ class VariableExtractor:
 
         # 解析Set-Cookie头
         # 格式: name=value; path=/; domain=...
-        pattern = rf'{name}=([^;]+)'
-        match = re.search(pattern, set_cookie)
+        match = _cookie_pattern(name).search(set_cookie)
         if match:
             return match.group(1)
         return None
 
 
-# 测试代码
+# 测试代码（实现在_selftest中，仅直接运行时加载）
 if __name__ == '__main__':
-    extractor = VariableExtractor()
-
-    # 测试数据
-    response_data = {
-        'code': 200,
-        'message': 'success',
-        'data': {
-            'user': {
-                'id': 12345,
-                'username': 'testuser',
-                'email': 'test@example.com'
-            },
-            'items': [
-                {'id': 1, 'name': 'item1'},
-                {'id': 2, 'name': 'item2'},
-                {'id': 3, 'name': 'item3'}
-            ]
-        }
-    }
-
-    headers = {
-        'Content-Type': 'application/json',
-        'X-Request-Id': 'req-12345',
-        'Set-Cookie': 'session_id=abc123; path=/; HttpOnly'
-    }
-
-    # 提取配置
-    extract_config = [
-        {'name': 'user_id', 'path': '$.data.user.id'},
-        {'name': 'username', 'path': '$.data.user.username'},
-        {'name': 'first_item_name', 'path': '$.data.items[0].name'},
-        {'name': 'all_item_ids', 'path': '$.data.items[*].id'},
-        {'name': 'request_id', 'header': 'X-Request-Id'},
-        {'name': 'session_id', 'cookie': 'session_id'},
-    ]
-
-    # 执行提取
-    result = extractor.extract(response_data, extract_config, headers)
-    print("提取结果:")
-    for name, value in result.items():
-        print(f"  {name}: {value}")
+    from ._selftest import run_variable_extractor
+    run_variable_extractor()